@@ -1,7 +1,12 @@
 
 # ... (Previous imports)
+import os
+import sys
 from fastapi import BackgroundTasks
 
+# ml/ holds flat modules that import each other by bare name
+ML_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ml")
+
 # ML Ops Imports
 try:
     from ml.monitoring import ModelMonitor
@@ -74,11 +79,15 @@ def analyze(
     
     # 5️⃣ Optimize Cold Start - Lazy load modules
     try:
-        from ml.intelligence_core import OptimizationEngine
-        from ml.data_loader import fetch_nasa_power_data
-        from ml.degradation_model import calculate_energy_metrics
-        from ml.hybrid_model import HybridCorrector
-        from ml.uncertainty_model import UncertaintyEngine
+        # The ml modules import each other by flat name, so import them the same way
+        # (each module is loaded once instead of also as ml.<name>)
+        if ML_DIR not in sys.path:
+            sys.path.append(ML_DIR)
+        from optimization_engine import OptimizationEngine
+        from data_loader import fetch_nasa_power_data
+        from degradation_model import calculate_energy_metrics, simulate_total_energy
+        from hybrid_model import HybridCorrector
+        from uncertainty_model import UncertaintyEngine
     except ImportError as e:
         logger.error(f"Failed to import ML modules: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error: ML modules missing")
@@ -91,8 +100,11 @@ def analyze(
             logger.warning(f"No weather data found for {latitude}, {longitude}")
             raise HTTPException(status_code=503, detail="Failed to fetch solar data (NASA POWER API)")
 
+        # Derived frames only append columns, so 'datetime' keeps this position
+        DATETIME_COL = df.columns.get_loc('datetime')
+
         # 2. Run Base Model (Baseline Physics)
-        df_base = calculate_energy_metrics(df.copy(), cleaning_dates=[])
+        df_base = calculate_energy_metrics(df, cleaning_dates=[])
 
         # 3. Hybrid Intelligence (Physics + ML Residual)
         hybrid_model = HybridCorrector()
@@ -117,17 +129,19 @@ def analyze(
         
         optimization_result = optimizer.optimize_cleaning_schedule(df_base)
         optimal_schedule_indices = optimization_result['cleaning_dates']
-        optimal_dates = [df_base.iloc[i]['datetime'] for i in optimal_schedule_indices]
+        optimal_dates = [df_base.iat[i, DATETIME_COL] for i in optimal_schedule_indices]
         
         # 5. Simulate Optimal Scenario & Uncertainty
-        df_optimal = calculate_energy_metrics(df.copy(), cleaning_dates=optimal_dates)
+        df_optimal = calculate_energy_metrics(df, cleaning_dates=optimal_dates)
         df_optimal = hybrid_model.correct_physics_prediction(df_optimal)
         
         # Monte Carlo Engine
         uq_engine = UncertaintyEngine(simulations=50)
         uq_stats = uq_engine.run_monte_carlo(
-            df.copy(), 
-            lambda d: hybrid_model.correct_physics_prediction(calculate_energy_metrics(d, cleaning_dates=optimal_dates))
+            df, 
+            lambda d: hybrid_model.correct_physics_prediction(calculate_energy_metrics(d, cleaning_dates=optimal_dates)),
+            # The totals only read 'actual_energy_kwh' (physics), so the batched run gives the same stats
+            batch_model_func=lambda d, irr, temp: simulate_total_energy(d, irr, temp, cleaning_dates=optimal_dates)
         )
         
         # 6. Calculate Metrics
@@ -157,7 +171,7 @@ def analyze(
         reasons = []
         if len(optimal_dates) > 0:
             next_clean_date = optimal_dates[0]
-            days_until = (next_clean_date - df_base.iloc[0]['datetime']).days
+            days_until = (next_clean_date - df_base.iat[0, DATETIME_COL]).days
             reasons.append(f"Dust accumulation > 5% threshold in {days_until} days.")
             reasons.append(f"Projected Net Revenue: ₹{net_benefit * scale_factor:,.0f} (Growth)")
             reasons.append(f"Confidence (90%): ₹{uq_engine.calculate_risk_adjusted_revenue(uq_stats['p10_energy'] - base_energy, 6.0) * scale_factor - (total_cost * scale_factor):,.0f} (Conservative)")
@@ -170,10 +184,12 @@ def analyze(
                 reasons.append("ROI Negative: Cleaning cost exceeds energy recovery.")
             reasons.append("Dust levels insufficient to justify mobilization.")
 
+        cleaning_date_strs = [f"{d:%Y-%m-%d}" for d in optimal_dates]
+
         response_payload = {
             "recommendation": "CLEAN" if len(optimal_dates) > 0 else "WAIT",
-            "cleaning_date": str(optimal_dates[0].date()) if len(optimal_dates) > 0 else None,
-            "cleaning_dates": [str(d.date()) for d in optimal_dates],
+            "cleaning_date": cleaning_date_strs[0] if cleaning_date_strs else None,
+            "cleaning_dates": cleaning_date_strs,
             "total_output_gain_percent": round((energy_gain / base_energy) * 100, 2) if base_energy > 0 else 0,
             "recoverable_capture_percent": 85.0, 
             "additional_energy_kwh": round(energy_gain * scale_factor, 2),
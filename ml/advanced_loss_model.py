@@ -2,69 +2,72 @@
 import numpy as np
 import pandas as pd
 
+# Low-light mismatch rule (also used by degradation_model's batched energy kernel)
+MISMATCH_RATED = 0.01              # Rated mismatch at normal irradiance (1%)
+MISMATCH_LOW_LIGHT_IRRADIANCE = 200.0  # W/m^2 below which the low-light penalty applies
+MISMATCH_LOW_LIGHT_SLOPE = 0.05    # Extra loss at 0 W/m^2, linear up to the knee
+MISMATCH_CAP = 0.10                # Max mismatch loss
+
 def calculate_shading_loss(hour_of_day, day_of_year=1, latitude=13.0, gcr=0.4):
     """
     Estimate row-to-row shading loss based on simple geometry.
     
     Args:
-        hour_of_day (float): 0-23
+        hour_of_day (float or array): 0-23
         day_of_year (int): 1-365 (Approximate sun declination)
         latitude (float): Site latitude
         gcr (float): Ground Coverage Ratio (Panel Width / Row Pitch). 0.4 is typical.
         
     Returns:
-        float: Shading factor (0.0 = no shade, 1.0 = full shade)
+        float: Shading factor (0.0 = no shade, 1.0 = full shade); an array for array input
         
     Note: Real shading is complex. This is a "tub-shape" curve approximation:
     High shading at sunrise/sunset, zero at noon.
     """
-    # Simple hour angle model: Noon = 0, +/- from there
-    # Sunrise/Sunset approx 6am/6pm for equator-ish
-    if hour_of_day < 6 or hour_of_day > 18:
-        return 1.0 # Night / Full shade
-        
-    # Normalized position: 0 at 6am, 1 at noon, 0 at 6pm?
-    # No, 0 shading at noon.
+    # Scalars in -> float out; arrays (e.g. a whole column of hours) are handled in one pass
+    hour = np.asarray(hour_of_day, dtype=np.float64)
     
+    # Simple hour angle model: Noon = 0, +/- from there
     # Parabolic approximation for shading impact
     # Shade is high when sun is low (close to 6 and 18)
-    time_from_noon = abs(hour_of_day - 12)
+    time_from_noon = np.abs(hour - 12)
     
     # Critical angle where shading starts?
     # Let's say shading happens when > 4 hours from noon (before 8am, after 4pm)
-    if time_from_noon < 4:
-        return 0.0
-        
     # Between 4 and 6 hours from noon, shading ramps up
-    # 4h -> 0%
+    # 4h -> 0%  (the clip gives exactly 0 closer to noon)
     # 6h -> 100% (or max usable)
     excess = time_from_noon - 4
-    loss = excess / 2.0 # Linear ramp to 100%
+    loss = np.clip(excess / 2.0, 0.0, 1.0) * 0.5 # Max 50% loss due to bypass diodes saving some strings
     
-    return min(max(loss, 0.0), 1.0) * 0.5 # Max 50% loss due to bypass diodes saving some strings
+    # Sunrise/Sunset approx 6am/6pm for equator-ish
+    loss = np.where((hour < 6) | (hour > 18), 1.0, loss) # Night / Full shade
+    return loss if loss.ndim else float(loss)
 
-def calculate_mismatch_loss(irradiance, rated_mismatch=0.01):
+def calculate_mismatch_loss(irradiance, rated_mismatch=MISMATCH_RATED):
     """
     Spectral/Low-light mismatch loss.
     Inverters and panels are less efficient at low irradiance.
+    Accepts a scalar or an array of irradiance (W/m^2).
     """
-    if irradiance <= 0:
-        return 0.0 # No light = No mismatch loss (energy is 0 anyway)
-        
+    # Scalars in -> float out; arrays (any shape) are handled in one pass
+    irr = np.asarray(irradiance, dtype=np.float64)
+    
     # Loss increases as irradiance drops below 200 W/m2
     # But we must clamp it to avoid unrealistic values
-    loss = rated_mismatch
+    # Exponential increase in loss
+    # at 200 -> rated_mismatch (1%)
+    # at 50 -> maybe 3-4%?
+    # Formula: Base + (200-Irr)/200 * 0.05
+    knee = MISMATCH_LOW_LIGHT_IRRADIANCE
+    low_light_penalty = np.where(irr < knee, MISMATCH_LOW_LIGHT_SLOPE * (knee - irr) / knee, 0.0)
     
-    if irradiance < 200:
-        # Exponential increase in loss
-        # at 200 -> rated_mismatch (1%)
-        # at 50 -> maybe 3-4%?
-        # Formula: Base + (200-Irr)/200 * 0.05
-        low_light_penalty = 0.05 * (200 - irradiance) / 200
-        loss += low_light_penalty
-        
     # Cap mismatch at 10% (0.10) to prevent "broken system" flags on just cloudy days
-    return min(loss, 0.10)
+    loss = np.minimum(rated_mismatch + low_light_penalty, MISMATCH_CAP)
+    
+    # No light = No mismatch loss (energy is 0 anyway)
+    loss = np.where(irr <= 0, 0.0, loss)
+    return loss if loss.ndim else float(loss)
 
 def calculate_aging_loss(years_active, rate_per_year=0.005, model='linear'):
     """
@@ -11,7 +11,7 @@ import sys
 # Ensure local modules can be imported
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from data_loader import fetch_nasa_power_data
+from data_loader import fetch_nasa_power_data, fetch_nasa_power_data_batch
 from rain_model import check_rain_forecast_wait
 from intelligence_core import run_simulation
 from degradation_model import calculate_energy_metrics
@@ -20,7 +20,7 @@ from feature_engineering import FeatureEngineer
 from residual_model import ResidualLearner
 from evaluation import evaluate_model
 from hybrid_model import HybridCorrector
-from optimization_engine import OptimizationEngine
+from optimization_engine import OptimizationEngine, extract_forecast_arrays
 
 app = FastAPI(title="SolarOS Intelligence API")
 
@@ -150,9 +150,12 @@ def optimize_farm_portfolio(request: OptimizationRequest):
         
         ai_insights = []
 
+        # Fetch every farm's weather up front: concurrent, one request per distinct location
+        weather = fetch_nasa_power_data_batch(((f.latitude, f.longitude) for f in request.farms), days=30)
+
         for farm in request.farms:
             # 1. Fetch Data
-            df = fetch_nasa_power_data(latitude=farm.latitude, longitude=farm.longitude, days=30)
+            df = weather[(float(farm.latitude), float(farm.longitude))]
             
             if df.empty:
                 continue 
@@ -160,7 +163,7 @@ def optimize_farm_portfolio(request: OptimizationRequest):
             # 2. Physics & ML
             scaling_factor = farm.panel_area / 100.0
             
-            df_physics = calculate_energy_metrics(df.copy())
+            df_physics = calculate_energy_metrics(df)
             
             hybrid_model = HybridCorrector() 
             df_final = hybrid_model.correct_physics_prediction(df_physics)
@@ -173,11 +176,13 @@ def optimize_farm_portfolio(request: OptimizationRequest):
                 water_usage_per_clean=farm.water_usage
             )
             
-            opt_res = optimizer.optimize_cleaning_schedule(df_final)
+            # Pull the forecast columns out once; the DP and the intervals share them
+            forecast_arrays = extract_forecast_arrays(df_final)
+            opt_res = optimizer.optimize_cleaning_schedule(forecast_arrays)
             
             # 3b. Uncertainty Quantification
             # Calculate P10/P90 Confidence Intervals for this schedule
-            confidence_intervals = optimizer.calculate_confidence_intervals(opt_res['cleaning_dates'], df_final)
+            confidence_intervals = optimizer.calculate_confidence_intervals(opt_res['cleaning_dates'], forecast_arrays)
             
             p10_val = confidence_intervals['p10'] * scaling_factor
             p50_val = confidence_intervals['p50'] * scaling_factor
@@ -1,6 +1,8 @@
 import requests
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 
 def fetch_nasa_power_data(latitude=13.0827, longitude=80.2707, days=30):
     """
@@ -102,6 +104,46 @@ def fetch_nasa_power_data(latitude=13.0827, longitude=80.2707, days=30):
         print(f"An unexpected error occurred: {e}")
         return pd.DataFrame()
 
+def fetch_nasa_power_data_batch(locations, days=30, max_workers=8):
+    """
+    Fetches NASA POWER data for several locations concurrently.
+
+    NASA POWER's hourly point API takes one location per request, so the win here is
+    overlapping the round-trips (threads, since `requests` is blocking) and fetching
+    each distinct location only once.
+
+    Args:
+        locations (iterable): (latitude, longitude) pairs. Duplicates are fetched once.
+        days (int): Number of days of data to fetch.
+        max_workers (int): Maximum concurrent requests.
+
+    Returns:
+        dict: {(latitude, longitude): pd.DataFrame} (empty DataFrame on failure, like fetch_nasa_power_data).
+    """
+    unique_locations = list(dict.fromkeys((float(lat), float(lon)) for lat, lon in locations))
+    if not unique_locations:
+        return {}
+
+    workers = max(1, min(max_workers, len(unique_locations)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        frames = pool.map(
+            lambda loc: fetch_nasa_power_data(latitude=loc[0], longitude=loc[1], days=days),
+            unique_locations,
+        )
+        return dict(zip(unique_locations, frames))
+
+def is_whole_day_hourly_grid(times):
+    """
+    True when `times` (a datetime64 array, as fetched) is a gapless hourly grid of
+    whole days starting at midnight, i.e. per-day values are a reshape to (days, 24).
+    Gaps, partial days or tz-aware (object) arrays -> False.
+    """
+    return bool(
+        times.dtype.kind == 'M' and len(times) > 0 and len(times) % 24 == 0
+        and times[0] == times[0].astype('datetime64[D]')
+        and np.all(np.diff(times) == np.timedelta64(1, 'h'))
+    )
+
 if __name__ == "__main__":
     # Test the function
     df = fetch_nasa_power_data()
@@ -1,43 +1,66 @@
 import pandas as pd
 import numpy as np
+import sys
+import os
 from datetime import timedelta
 
-def calculate_energy_metrics(df, panel_area=100.0, cleaning_dates=None, reference_date=None):
+# Ensure local imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from numba_compat import njit, prange, NUMBA_AVAILABLE
+
+# Advanced loss models (shading, low-light mismatch) are optional
+try:
+    from advanced_loss_model import (
+        calculate_shading_loss, calculate_mismatch_loss,
+        MISMATCH_RATED, MISMATCH_LOW_LIGHT_IRRADIANCE, MISMATCH_LOW_LIGHT_SLOPE, MISMATCH_CAP,
+    )
+    USE_ADVANCED = True
+except ImportError:
+    USE_ADVANCED = False
+    # Mismatch is off without them; the batched kernel still needs the names to compile
+    MISMATCH_RATED = MISMATCH_LOW_LIGHT_IRRADIANCE = MISMATCH_LOW_LIGHT_SLOPE = MISMATCH_CAP = 0.0
+
+# FROZEN PHYSICS CONSTANTS (DO NOT CHANGE during ML Training)
+# These represent the "Ideal World" or "datasheet" performance.
+BASE_EFFICIENCY = 0.20
+TEMP_COEFF = 0.004        # 0.4% per °C above 25°C
+REF_TEMP = 25.0
+DUST_ACCUMULATION_RATE = 0.15  # 15% loss over 30 days (Linear approximation)
+DAYS_IN_PERIOD = 30.0
+ANNUAL_DEGRADATION_RATE = 0.005 # 0.5% per year
+
+# Loss clamps (applied in calculate_base_metrics and in simulate_total_energy)
+TEMP_LOSS_CAP = 0.15
+AGING_LOSS_CAP = 0.05
+
+# Rain Cleaning Physics (Frozen)
+RAIN_CLEANING_GAMMA = 0.4      # Dust reduction efficiency per mm of rain
+RAIN_THRESHOLD = 0.1           # Minimum rain to have any effect
+
+
+def calculate_base_metrics(df, reference_date=None):
     """
-    Simulates solar panel efficiency degradation and energy output using multiplicative losses.
+    Cleaning-independent half of calculate_energy_metrics.
 
-    effective_efficiency = base_efficiency * (1 - dust_level) * (1 - temperature_loss) * (1 - aging_loss)
+    Computes every loss that does not depend on the cleaning schedule (temperature,
+    aging, shading, mismatch). This is the expensive part, so scenarios that only
+    differ in cleaning dates should compute it once and pass the result to
+    apply_cleaning_schedule for each schedule.
 
     Args:
         df (pd.DataFrame): DataFrame containing 'datetime', 'irradiance' (W/m^2), and 'temperature' (C).
-        panel_area (float): Area of the solar panels in square meters. Default is 100.0.
-        cleaning_dates (list): List of datetime strings or objects representing cleaning events.
         reference_date: Optional datetime for aging baseline (default: first row datetime).
 
     Returns:
-        pd.DataFrame: The input DataFrame with added columns:
-            - base_efficiency
-            - temperature_loss (fraction 0-1)
-            - dust_level (fraction 0-1)
-            - aging_loss (fraction 0-1)
-            - temp_loss, dust_loss (aliases for compatibility)
-            - effective_efficiency
-            - ideal_energy_kwh
-            - actual_energy_kwh
-            - recoverable_energy_kwh
+        pd.DataFrame: A new DataFrame (the input is not modified) with the static loss columns.
+        dust_level / dust_loss are zero placeholders so columns keep their usual order.
+
+    Frames along the pipeline (this one, apply_cleaning_schedule's, the hybrid and
+    synthetic-truth frames) are shallow copies: each stage only adds or replaces
+    columns, so the column arrays are shared with the stage before it instead of
+    copied. Nothing may write into an existing column's array in place.
     """
-    # FROZEN PHYSICS CONSTANTS (DO NOT CHANGE during ML Training)
-    # These represent the "Ideal World" or "datasheet" performance.
-    BASE_EFFICIENCY = 0.20
-    TEMP_COEFF = 0.004        # 0.4% per °C above 25°C
-    REF_TEMP = 25.0
-    DUST_ACCUMULATION_RATE = 0.15  # 15% loss over 30 days (Linear approximation)
-    DAYS_IN_PERIOD = 30.0
-    ANNUAL_DEGRADATION_RATE = 0.005 # 0.5% per year
-    
-    # Rain Cleaning Physics (Frozen)
-    RAIN_CLEANING_GAMMA = 0.4      # Dust reduction efficiency per mm of rain
-    RAIN_THRESHOLD = 0.1           # Minimum rain to have any effect
+    df = df.copy(deep=False)
 
     # Ensure datetime is datetime type
     if not pd.api.types.is_datetime64_any_dtype(df['datetime']):
@@ -54,73 +77,15 @@ def calculate_energy_metrics(df, panel_area=100.0, cleaning_dates=None, referenc
     df['temperature_loss'] = np.clip(np.where(temp_diff > 0, temp_diff * TEMP_COEFF, 0.0), 0.0, 1.0)
     df['temp_loss'] = df['temperature_loss']  # alias for compatibility
 
-    # 3. Dust Level (fraction 0–1): linear 0% to 15% over 30 days since last cleaning, MINUS rain cleaning
-    
-    # Pre-calculate days since cleaning for manual cleans
-    manual_clean_mask = pd.Series(False, index=df.index)
-    if cleaning_dates:
-        clean_dt_set = set([pd.to_datetime(d).date() for d in cleaning_dates])
-        manual_clean_mask = df['datetime'].dt.date.isin(clean_dt_set)
-
-    # Initialize dust array
-    dust_levels = np.zeros(len(df))
-    current_dust = 0.0
-    
-    HOURLY_DUST_RATE = DUST_ACCUMULATION_RATE / (DAYS_IN_PERIOD * 24)
-    RAIN_GAMMA = RAIN_CLEANING_GAMMA
-
-    prev_time = start_time
-    
-    # Convert columns to numpy for speed
-    precip_values = df['precipitation'].values if 'precipitation' in df.columns else np.zeros(len(df))
-    time_values = df['datetime'].values
-    manual_clean_values = manual_clean_mask.values
-    
-    for i in range(len(df)):
-        # Time step check (usually 1 hour)
-        # dt = (time_values[i] - prev_time) / np.timedelta64(1, 'h')
-        # Simplified: just add hourly rate
-        
-        # 1. Add Dust
-        current_dust += HOURLY_DUST_RATE
-        
-        # 2. Check for Manual Clean
-        # If this hour allows cleaning (e.g., 6 AM?), or just reset if day matches?
-        # Let's say cleaning happens at 00:00 or whenever the row is marked.
-        # Simplification: if manual_clean_values[i] is True, reset to 0.
-        # But cleaning_dates are usually just "dates". We should clean at the start of that date.
-        # We handled this by checking date match.
-        if manual_clean_values[i]:
-            current_dust = 0.0
-            
-        # 3. Check for Rain Clean (Physics)
-        rain_mm = precip_values[i]
-        if rain_mm > 0.1: # Threshold for any cleaning effect
-             # Apply reduction: dust = dust * (1 - gamma * rain)
-             # Cap reduction at 95% per hour to avoid instant perfect clean from 1mm rain
-             reduction = min(RAIN_GAMMA * rain_mm, 0.95)
-             current_dust = current_dust * (1.0 - reduction)
-             
-        # Cap max dust at 1.0 (100% block)
-        current_dust = min(current_dust, 1.0)
-        dust_levels[i] = current_dust
-        
-        # prev_time = time_values[i]
-
-    df['dust_level'] = dust_levels
-    df['dust_loss'] = df['dust_level']  # alias for compatibility
+    # 3. Dust Level: depends on cleaning dates, filled in by apply_cleaning_schedule
+    df['dust_level'] = 0.0
+    df['dust_loss'] = 0.0
 
     # 4. Aging Loss (fraction 0–1): annual degradation from reference date
     years_since_ref = (df['datetime'] - ref_time).dt.total_seconds() / (365.25 * 24 * 3600)
     years_since_ref = np.maximum(years_since_ref, 0.0)
     
-    # Import Advanced Models
-    try:
-        from advanced_loss_model import calculate_shading_loss, calculate_mismatch_loss, calculate_aging_loss
-        USE_ADVANCED = True
-    except ImportError:
-        USE_ADVANCED = False
-        
+    # Advanced Models: USE_ADVANCED is resolved once at import
     if USE_ADVANCED:
         # Vectorized Aging (Bath-tub or Linear, let's use Linear for standard run)
         # For array operations, we can map or vectorise.
@@ -132,33 +97,162 @@ def calculate_energy_metrics(df, panel_area=100.0, cleaning_dates=None, referenc
     # 5. Advanced Losses: Shading & Mismatch
     if USE_ADVANCED:
         # Shading
-        hour_of_day = df['datetime'].dt.hour
-        df['shading_loss'] = hour_of_day.apply(lambda h: calculate_shading_loss(h, latitude=13.0))
+        # Hour of day straight from the datetime64 ticks: one int8 array, no .dt accessor
+        # (tz-aware columns come back as object arrays and keep the .dt path)
+        datetimes = df['datetime'].to_numpy()
+        if datetimes.dtype.kind == 'M':
+            hour_of_day = (datetimes.astype('datetime64[h]').astype(np.int64) % 24).astype(np.int8)
+        else:
+            hour_of_day = df['datetime'].dt.hour.to_numpy()
+        # The curve only depends on the hour: evaluate it for the 24 hours, then gather
+        shading_by_hour = calculate_shading_loss(np.arange(24), latitude=13.0)
+        df['shading_loss'] = shading_by_hour[hour_of_day]
         
         # Mismatch
-        df['mismatch_loss'] = df['irradiance'].apply(lambda irr: calculate_mismatch_loss(irr))
+        df['mismatch_loss'] = calculate_mismatch_loss(df['irradiance'].to_numpy())
     else:
         df['shading_loss'] = 0.0
         df['mismatch_loss'] = 0.0
 
-    # 6. Effective Efficiency (multiplicative)
+    # CLAMP LOSSES per User Request to prevent explosion (dust is clamped per schedule)
+    df['temperature_loss'] = df['temperature_loss'].clip(upper=TEMP_LOSS_CAP)
+    df['aging_loss'] = df['aging_loss'].clip(upper=AGING_LOSS_CAP)
+    df['mismatch_loss'] = df['mismatch_loss'].clip(upper=MISMATCH_CAP) # Redundant but safe
+
+    return df
+
+
+@njit(cache=True)
+def _dust_levels_kernel(manual_clean, precip, hourly_rate, rain_threshold, rain_gamma):
+    """
+    Hourly dust level (fraction 0-1) for apply_cleaning_schedule.
+    NaN precipitation fails the threshold test, i.e. counts as no rain.
+    """
+    n = precip.shape[0]
+    dust_levels = np.empty(n)
+    current_dust = 0.0
+    for i in range(n):
+        # 1. Add Dust
+        current_dust += hourly_rate
+        
+        # 2. Manual Clean: cleaning happens at the start of a marked day -> reset
+        if manual_clean[i]:
+            current_dust = 0.0
+        
+        # 3. Rain Clean (Physics): dust = dust * (1 - gamma * rain)
+        # Cap reduction at 95% per hour to avoid instant perfect clean from 1mm rain
+        rain_mm = precip[i]
+        if rain_mm > rain_threshold:
+            reduction = rain_gamma * rain_mm
+            if reduction > 0.95:
+                reduction = 0.95
+            current_dust = current_dust * (1.0 - reduction)
+        
+        # Cap max dust at 1.0 (100% block)
+        if current_dust > 1.0:
+            current_dust = 1.0
+        dust_levels[i] = current_dust
+    return dust_levels
+
+
+def _dust_levels_numpy(manual_clean, precip, hourly_rate, rain_threshold, rain_gamma):
+    """
+    Same result as _dust_levels_kernel without Numba.
+    
+    Between events (manual cleans / rain hours) dust only grows by hourly_rate, so each
+    such run is one cumsum seeded with the carried level (sequential adds, the same
+    rounding as the hourly loop) capped at 1.0; Python only steps over the events.
+    """
+    n = precip.shape[0]
+    rain = precip > rain_threshold
+    dust_levels = np.empty(n)
+    current_dust = 0.0
+    start = 0
+    for event in np.flatnonzero(manual_clean | rain).tolist() + [n]:
+        if event > start:
+            growth = np.full(event - start + 1, hourly_rate)
+            growth[0] = current_dust
+            dust_levels[start:event] = np.minimum(np.cumsum(growth)[1:], 1.0)
+            current_dust = dust_levels[event - 1]
+        if event == n:
+            break
+        
+        current_dust += hourly_rate
+        if manual_clean[event]:
+            current_dust = 0.0
+        if rain[event]:
+            reduction = min(rain_gamma * precip[event], 0.95)
+            current_dust = current_dust * (1.0 - reduction)
+        if current_dust > 1.0:
+            current_dust = 1.0
+        dust_levels[event] = current_dust
+        start = event + 1
+    return dust_levels
+
+
+def apply_cleaning_schedule(base_df, cleaning_dates=None, panel_area=100.0):
+    """
+    Cleaning-dependent half of calculate_energy_metrics.
+
+    Runs the dust accumulation / rain / manual cleaning simulation on a frame from
+    calculate_base_metrics and derives efficiency and energy from it.
+
+    Args:
+        base_df (pd.DataFrame): Output of calculate_base_metrics (not modified).
+        cleaning_dates (list): List of datetime strings or objects representing cleaning events.
+        panel_area (float): Area of the solar panels in square meters. Default is 100.0.
+
+    Returns:
+        pd.DataFrame: Same columns as calculate_energy_metrics.
+    """
+    df = base_df.copy(deep=False)
+
+    # 3. Dust Level (fraction 0–1): linear 0% to 15% over 30 days since last cleaning, MINUS rain cleaning
+    
+    # Pre-calculate days since cleaning for manual cleans
+    manual_clean_mask = pd.Series(False, index=df.index)
+    if cleaning_dates:
+        clean_dt_set = set([pd.to_datetime(d).date() for d in cleaning_dates])
+        datetimes = df['datetime'].to_numpy()
+        if datetimes.dtype.kind == 'M':
+            # Calendar day of each row as datetime64[D]: no per-row date objects
+            clean_days = np.array(sorted(clean_dt_set), dtype='datetime64[D]')
+            manual_clean_mask = pd.Series(np.isin(datetimes.astype('datetime64[D]'), clean_days), index=df.index)
+        else:
+            manual_clean_mask = df['datetime'].dt.date.isin(clean_dt_set)
+
+    HOURLY_DUST_RATE = DUST_ACCUMULATION_RATE / (DAYS_IN_PERIOD * 24)
+    
+    # Hour by hour: add dust, reset on manual clean days, wash off a share on rain,
+    # cap at 1.0 (100% block). Compiled kernel, or the event-segmented NumPy version.
+    if 'precipitation' in df.columns:
+        precip = np.ascontiguousarray(df['precipitation'].to_numpy(dtype=np.float64))
+    else:
+        precip = np.zeros(len(df))
+    manual_clean = np.ascontiguousarray(manual_clean_mask.to_numpy(dtype=np.bool_))
+    dust_fn = _dust_levels_kernel if NUMBA_AVAILABLE else _dust_levels_numpy
+    dust_levels = dust_fn(manual_clean, precip, HOURLY_DUST_RATE, RAIN_THRESHOLD, RAIN_CLEANING_GAMMA)
+
+    df['dust_loss'] = dust_levels  # alias for compatibility (before the clamp)
+
+    # 6. Effective Efficiency (multiplicative), on the column arrays in one expression
     # effective_eff = base * (1-dust) * (1-temp) * (1-age) * (1-shade) * (1-mismatch)
     
     # CLAMP LOSSES per User Request to prevent explosion
-    df['dust_level'] = df['dust_level'].clip(upper=0.30)
-    df['temperature_loss'] = df['temperature_loss'].clip(upper=0.15)
-    df['aging_loss'] = df['aging_loss'].clip(upper=0.05)
-    df['mismatch_loss'] = df['mismatch_loss'].clip(upper=0.10) # Redundant but safe
+    dust_level = np.minimum(dust_levels, 0.30)
+    df['dust_level'] = dust_level
     
-    df['effective_efficiency'] = (
-        df['base_efficiency']
-        * (1.0 - df['dust_level'])
-        * (1.0 - df['temperature_loss'])
-        * (1.0 - df['aging_loss'])
-        * (1.0 - df['shading_loss'])
-        * (1.0 - df['mismatch_loss'])
+    base_efficiency = df['base_efficiency'].to_numpy()
+    effective_efficiency = (
+        base_efficiency
+        * (1.0 - dust_level)
+        * (1.0 - df['temperature_loss'].to_numpy())
+        * (1.0 - df['aging_loss'].to_numpy())
+        * (1.0 - df['shading_loss'].to_numpy())
+        * (1.0 - df['mismatch_loss'].to_numpy())
     )
-    df['effective_efficiency'] = df['effective_efficiency'].clip(lower=0.0)
+    np.maximum(effective_efficiency, 0.0, out=effective_efficiency)
+    df['effective_efficiency'] = effective_efficiency
     
     # Calculate Overall Health Score
     # User Request: Health = 100 * (effective / base)
@@ -167,20 +261,166 @@ def calculate_energy_metrics(df, panel_area=100.0, cleaning_dates=None, referenc
     # Usually instantaneous health is this ratio.
     # To get a single scalar for the "Health Score" later, we'll take the mean of this column
     # or calculate it row-wise here.
-    df['health_score'] = df['effective_efficiency'] / df['base_efficiency']
+    df['health_score'] = effective_efficiency / base_efficiency
     
+    _add_energy_columns(df, panel_area)
+    return df
+
+
+def _add_energy_columns(df, panel_area):
+    """Energy columns (in place) from the efficiency columns; the only panel_area-dependent step."""
     # 7. Energy Calculation (kWh)
     # Energy (kWh) = Irradiance (W/m^2) * Area (m^2) * Efficiency * Time (h) / 1000
     # Since data is hourly, Time = 1 hour.
-    df['ideal_energy_kwh'] = (df['irradiance'] * panel_area * df['base_efficiency']) / 1000.0
-    df['actual_energy_kwh'] = (df['irradiance'] * panel_area * df['effective_efficiency']) / 1000.0
+    irradiance_area = df['irradiance'].to_numpy() * panel_area
+    ideal_energy_kwh = (irradiance_area * df['base_efficiency'].to_numpy()) / 1000.0
+    actual_energy_kwh = (irradiance_area * df['effective_efficiency'].to_numpy()) / 1000.0
+    df['ideal_energy_kwh'] = ideal_energy_kwh
+    df['actual_energy_kwh'] = actual_energy_kwh
 
     # 7. Recoverable Energy
     # Ideal - Actual
-    df['recoverable_energy_kwh'] = df['ideal_energy_kwh'] - df['actual_energy_kwh']
-    
+    df['recoverable_energy_kwh'] = ideal_energy_kwh - actual_energy_kwh
+
+
+def rescale_panel_area(processed_df, panel_area):
+    """
+    Same schedule, different installation size: recomputes only the energy columns of an
+    apply_cleaning_schedule / calculate_energy_metrics result for `panel_area`.
+
+    The dust simulation doesn't depend on panel area, so this matches re-running
+    apply_cleaning_schedule with the new area exactly. Returns a shallow copy.
+    """
+    df = processed_df.copy(deep=False)
+    _add_energy_columns(df, panel_area)
     return df
 
+
+def calculate_energy_metrics(df, panel_area=100.0, cleaning_dates=None, reference_date=None):
+    """
+    Simulates solar panel efficiency degradation and energy output using multiplicative losses.
+
+    effective_efficiency = base_efficiency * (1 - dust_level) * (1 - temperature_loss) * (1 - aging_loss)
+
+    Equivalent to apply_cleaning_schedule(calculate_base_metrics(df, reference_date), ...).
+    When several cleaning schedules are evaluated on the same weather, compute the
+    base once and call apply_cleaning_schedule per schedule instead.
+
+    Args:
+        df (pd.DataFrame): DataFrame containing 'datetime', 'irradiance' (W/m^2), and 'temperature' (C).
+        panel_area (float): Area of the solar panels in square meters. Default is 100.0.
+        cleaning_dates (list): List of datetime strings or objects representing cleaning events.
+        reference_date: Optional datetime for aging baseline (default: first row datetime).
+
+    The input DataFrame is not modified: columns are added to a shallow copy
+    that shares the input's arrays, so callers don't need to pass df.copy().
+
+    Returns:
+        pd.DataFrame: A new DataFrame with the input columns plus:
+            - base_efficiency
+            - temperature_loss (fraction 0-1)
+            - dust_level (fraction 0-1)
+            - aging_loss (fraction 0-1)
+            - temp_loss, dust_loss (aliases for compatibility)
+            - effective_efficiency
+            - ideal_energy_kwh
+            - actual_energy_kwh
+            - recoverable_energy_kwh
+    """
+    base_df = calculate_base_metrics(df, reference_date=reference_date)
+    return apply_cleaning_schedule(base_df, cleaning_dates=cleaning_dates, panel_area=panel_area)
+
+
+@njit(cache=True, parallel=True, nogil=True)
+def _simulate_totals_kernel(irradiance, temperature, clean_efficiency, aging_loss, shading_loss,
+                            panel_area, use_mismatch):
+    """
+    Per-simulation energy totals, prange over simulations (rows).
+    clean_efficiency = base_efficiency * (1 - dust_level) of the nominal run; the
+    temperature and mismatch rules are the scalar forms of calculate_base_metrics.
+    """
+    n_sims, n_rows = irradiance.shape
+    totals = np.zeros(n_sims)
+    for s in prange(n_sims):
+        total = 0.0
+        for t in range(n_rows):
+            irr = irradiance[s, t]
+
+            temp_loss = 0.0
+            temp_diff = temperature[s, t] - REF_TEMP
+            if temp_diff > 0:
+                temp_loss = min(temp_diff * TEMP_COEFF, TEMP_LOSS_CAP)
+
+            mismatch = 0.0
+            if use_mismatch and irr > 0:
+                mismatch = MISMATCH_RATED
+                if irr < MISMATCH_LOW_LIGHT_IRRADIANCE:
+                    mismatch += (MISMATCH_LOW_LIGHT_SLOPE * (MISMATCH_LOW_LIGHT_IRRADIANCE - irr)
+                                 / MISMATCH_LOW_LIGHT_IRRADIANCE)
+                if mismatch > MISMATCH_CAP:
+                    mismatch = MISMATCH_CAP
+
+            eff = (clean_efficiency[t] * (1.0 - temp_loss) * (1.0 - aging_loss[t])
+                   * (1.0 - shading_loss[t]) * (1.0 - mismatch))
+            if eff < 0.0:
+                eff = 0.0
+            total += (irr * panel_area * eff) / 1000.0
+        totals[s] = total
+    return totals
+
+
+def simulate_total_energy(df, irradiance, temperature, panel_area=100.0, cleaning_dates=None, reference_date=None):
+    """
+    Total actual energy (kWh) for a batch of weather variants of `df`, in one pass.
+
+    Row s of `irradiance` / `temperature` (shape (S, T), T = len(df)) replaces the
+    df columns for simulation s. The result (shape (S,)) matches
+    calculate_energy_metrics(variant_s, ...)['actual_energy_kwh'].sum() per row,
+    without building S DataFrames: dust, aging and shading don't depend on the
+    weather columns, so they come from a single run on the nominal df and only the
+    temperature and mismatch losses are evaluated on the 2-D arrays (a parallel
+    Numba kernel when available, NumPy broadcasting otherwise).
+    """
+    irradiance = np.ascontiguousarray(irradiance, dtype=np.float64)
+    temperature = np.ascontiguousarray(temperature, dtype=np.float64)
+
+    nominal = calculate_energy_metrics(df, panel_area=panel_area, cleaning_dates=cleaning_dates,
+                                       reference_date=reference_date)
+
+    if NUMBA_AVAILABLE:
+        clean_efficiency = (nominal['base_efficiency'].to_numpy()
+                            * (1.0 - nominal['dust_level'].to_numpy()))
+        return _simulate_totals_kernel(
+            irradiance, temperature, clean_efficiency,
+            nominal['aging_loss'].to_numpy(dtype=np.float64),
+            nominal['shading_loss'].to_numpy(dtype=np.float64),
+            float(panel_area), USE_ADVANCED,  # mismatch applies only with the advanced models
+        )
+
+    # Temperature loss, same rule and clamps as calculate_base_metrics
+    temp_diff = temperature - REF_TEMP
+    temperature_loss = np.clip(np.where(temp_diff > 0, temp_diff * TEMP_COEFF, 0.0), 0.0, 1.0)
+    temperature_loss = np.minimum(temperature_loss, TEMP_LOSS_CAP)
+
+    if USE_ADVANCED:
+        mismatch_loss = np.minimum(calculate_mismatch_loss(irradiance), MISMATCH_CAP)
+    else:
+        mismatch_loss = np.zeros_like(irradiance)
+
+    # Same factor order as apply_cleaning_schedule so results agree to the bit
+    effective_efficiency = (
+        nominal['base_efficiency'].to_numpy()
+        * (1.0 - nominal['dust_level'].to_numpy())
+        * (1.0 - temperature_loss)
+        * (1.0 - nominal['aging_loss'].to_numpy())
+        * (1.0 - nominal['shading_loss'].to_numpy())
+        * (1.0 - mismatch_loss)
+    )
+    effective_efficiency = np.maximum(effective_efficiency, 0.0)
+
+    actual_energy_kwh = (irradiance * panel_area * effective_efficiency) / 1000.0
+    return actual_energy_kwh.sum(axis=1)
+
 if __name__ == "__main__":
     # Test locally
     try:
@@ -191,14 +431,13 @@ if __name__ == "__main__":
         print("data_loader module not found. Generating dummy data...")
         # Dummy data generation if loader not found
         dates = pd.date_range(start='2023-01-01', periods=720, freq='h')
+        hour = dates.hour.to_numpy()
         df = pd.DataFrame({
             'datetime': dates,
-            'irradiance': np.random.uniform(0, 1000, 720), # Random irradiance 0-1000 W/m2
+            # Random irradiance 0-1000 W/m2, night (before 6, after 18) zeroed in the same pass
+            'irradiance': np.where((hour < 6) | (hour > 18), 0.0, np.random.uniform(0, 1000, 720)),
             'temperature': np.random.uniform(20, 35, 720)  # Random temp 20-35 C
         })
-        # Simulate night
-        df.loc[df['datetime'].dt.hour < 6, 'irradiance'] = 0
-        df.loc[df['datetime'].dt.hour > 18, 'irradiance'] = 0
 
     if not df.empty:
         df_processed = calculate_energy_metrics(df)
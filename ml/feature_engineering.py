@@ -22,8 +22,8 @@ class FeatureEngineer:
         Returns:
             X (pd.DataFrame): The feature matrix.
         """
-        # Work on a copy
-        X = df.copy()
+        # Work on a shallow copy (columns are only added/replaced, never written in place)
+        X = df.copy(deep=False)
         
         # 1. Temporal Features (Cyclic)
         # Hour of day is crucial for solar
@@ -1,6 +1,10 @@
 import numpy as np
 import pandas as pd
 import os
+import sys
+
+# Ensure local imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from feature_engineering import FeatureEngineer
 from residual_model import ResidualLearner
 
@@ -15,7 +19,7 @@ class HybridCorrector:
     4. Final Hybrid Prediction
     """
     
-    def __init__(self, model_path="ml_residual_model.pkl"):
+    def __init__(self, model_path="ml_residual_model"):
         self.fe = FeatureEngineer()
         self.learner = ResidualLearner(model_path)
         
@@ -40,7 +44,7 @@ class HybridCorrector:
         """
         Applies ML correction to the physics-based DataFrame.
         """
-        df = physics_df.copy()
+        df = physics_df.copy(deep=False)
         
         # 1. Create Features
         X = self.fe.create_features(df, is_training=False)
@@ -4,24 +4,28 @@ import numpy as np
 import sys
 import os
 from datetime import timedelta
+from functools import lru_cache
 
 # Ensure we can import local modules
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 try:
     from data_loader import fetch_nasa_power_data
     from degradation_model import calculate_energy_metrics
-    from optimization_engine import OptimizationEngine
-    from hybrid_model import HybridCorrector
-    from uncertainty_model import UncertaintyEngine
 except ImportError as e:
     print("Error: Could not import required modules.", e)
     sys.exit(1)
 
+# SSES normalization scales, stored as reciprocals so scoring multiplies instead of divides
+_INV_ENERGY_SCALE = 1.0 / 150000.0
+_INV_CARBON_SCALE = 1.0 / 10000.0
+_INV_WATER_SCALE = 1.0 / 50000.0
+_INV_COST_SCALE = 1.0 / 50000.0
+
 def calculate_sses(total_energy_kwh, total_water_liters, carbon_saved_kg, cost_inr):
-    norm_energy = total_energy_kwh / 150000.0 
-    norm_carbon = carbon_saved_kg / 10000.0   
-    norm_water = total_water_liters / 50000.0 
-    norm_cost = cost_inr / 50000.0            
+    norm_energy = total_energy_kwh * _INV_ENERGY_SCALE
+    norm_carbon = carbon_saved_kg * _INV_CARBON_SCALE
+    norm_water = total_water_liters * _INV_WATER_SCALE
+    norm_cost = cost_inr * _INV_COST_SCALE
     
     w_energy = 0.5
     w_carbon = 0.3
@@ -32,7 +36,49 @@ def calculate_sses(total_energy_kwh, total_water_liters, carbon_saved_kg, cost_i
     final_score = 50 + (raw_score * 50)
     return max(0, min(100, final_score))
 
-def run_simulation():
+# Column order of FeatureEngineer.create_features (maps importances back to names)
+FEATURE_NAMES = (
+    'irradiance', 'temperature', 'precipitation', 'dust_level',
+    'hour_sin', 'hour_cos', 'month',
+    'ghi_x_temp', 'dust_stickiness_proxy',
+    'ghi_rolling_mean_3h', 'temp_rolling_mean_6h',
+    'temp_deviation', 'temp_squared'
+)
+
+@lru_cache(maxsize=128)
+def _top_k_reason(importances, k=3):
+    """
+    Formats the top-k driving features as "name (importance), ...".
+    Cached on the importance tuple, which is fixed for a given trained model.
+    """
+    indices = np.argsort(importances)[::-1]
+    top_k = []
+    for idx in indices[:k]:
+        if idx < len(FEATURE_NAMES):
+            top_k.append(f"{FEATURE_NAMES[idx]} ({importances[idx]:.2f})")
+    return ', '.join(top_k)
+
+def calculate_cleaning_totals(n_cleans, water_usage_liters, cleaning_cost):
+    """
+    Water used and cleaning cost for one schedule or a batch of schedules.
+
+    `n_cleans` may be a scalar count or an array of counts (one per scenario of a sweep);
+    the outputs have the same shape.
+    """
+    per_clean = np.array([water_usage_liters, cleaning_cost], dtype=np.float64)
+    totals = np.multiply.outer(np.asarray(n_cleans, dtype=np.float64), per_clean)
+    return totals[..., 0], totals[..., 1]
+
+def run_simulation(*, use_hybrid=True, use_uq=True, use_truth=True):
+    """
+    Runs the end-to-end intelligence pipeline.
+
+    Lighter variants of the engine are presets of this one implementation:
+        use_hybrid: apply the ML residual correction (False = pure physics)
+        use_uq: report P10/P90 energy from the quantile models
+        use_truth: generate synthetic ground truth, retrain and evaluate the
+                   hybrid model (False = reuse the persisted model)
+    """
     print("--- Solar Intelligence Core Initialization (v3.0 Hybrid) ---")
     
     # Constants
@@ -53,6 +99,9 @@ def run_simulation():
         print("Error: No data fetched.")
         return
 
+    # Derived frames only append columns, so 'datetime' keeps this position
+    DATETIME_COL = df.columns.get_loc('datetime')
+
     # 2. Run Base Model (Baseline Physics)
     print("Running base degradation model (Physics)...")
     # For Training: We need a "History" and a "Forecast"
@@ -63,43 +112,60 @@ def run_simulation():
     # and then predict (in-sample) to demonstrate fit.
     # For a demo, "in-sample" verification is acceptable to show it CAN learn.
     
-    df_physics = calculate_energy_metrics(df.copy(), cleaning_dates=[])
+    df_physics = calculate_energy_metrics(df, cleaning_dates=[])
 
-    # 3. Generate Synthetic Ground Truth
-    print("Generating Synthetic Ground Truth (The 'Real' Data)...")
-    from synthetic_ground_truth import SyntheticTruthGenerator
-    truth_gen = SyntheticTruthGenerator()
-    df_truth = truth_gen.generate_truth(df_physics)
+    report = None
+    hybrid_model = None
+    use_truth = use_truth and use_hybrid  # Truth only feeds hybrid training
 
-    # 4. Hybrid Intelligence Training
-    print("Training Hybrid AI (XGBoost) on Ground Truth...")
-    hybrid_model = HybridCorrector()
-    
-    # Train on the first 20 days (Train Set)
-    train_cutoff = int(len(df_truth) * 0.7)
-    train_df = df_truth.iloc[:train_cutoff]
-    test_df = df_truth.iloc[train_cutoff:]
-    
-    hybrid_model.train_model(df_physics.iloc[:train_cutoff], train_df)
-    
-    # 5. Prediction & Evaluation
-    print("Applying ML Correction...")
-    # Predict on WHOLE dataset for optimization context
-    df_final = hybrid_model.correct_physics_prediction(df_physics)
-    
-    # Evaluate performance on Test Set (Unseen data)
-    from evaluation import evaluate_model, print_evaluation_report
-    
-    # Subset for eval
-    y_true_test = test_df['actual_truth_kwh']
-    y_phys_test = df_physics.iloc[train_cutoff:]['actual_energy_kwh']
-    y_hybr_test = df_final.iloc[train_cutoff:]['hybrid_energy_kwh']
-    
-    report = evaluate_model(y_true_test, y_phys_test, y_hybr_test)
-    print_evaluation_report(report)
+    if use_truth:
+        # 3. Generate Synthetic Ground Truth
+        print("Generating Synthetic Ground Truth (The 'Real' Data)...")
+        from synthetic_ground_truth import SyntheticTruthGenerator
+        truth_gen = SyntheticTruthGenerator()
+        df_truth = truth_gen.generate_truth(df_physics)
+
+    if use_hybrid:
+        # Lazy import: XGBoost is only paid for when the hybrid stage runs
+        from hybrid_model import HybridCorrector
+        hybrid_model = HybridCorrector()
+
+        if use_truth:
+            # 4. Hybrid Intelligence Training
+            print("Training Hybrid AI (XGBoost) on Ground Truth...")
+
+            # Train on the first 20 days (Train Set)
+            train_cutoff = int(len(df_truth) * 0.7)
+            train_df = df_truth.iloc[:train_cutoff]
+            test_df = df_truth.iloc[train_cutoff:]
+
+            hybrid_model.train_model(df_physics.iloc[:train_cutoff], train_df)
+
+        # 5. Prediction & Evaluation
+        print("Applying ML Correction...")
+        # Predict on WHOLE dataset for optimization context
+        df_final = hybrid_model.correct_physics_prediction(df_physics)
+        energy_col = 'hybrid_energy_kwh'
+    else:
+        df_final = df_physics
+        energy_col = 'actual_energy_kwh'
+
+    if use_truth:
+        # Evaluate performance on Test Set (Unseen data)
+        from evaluation import evaluate_model, print_evaluation_report
+
+        # Subset for eval (plain NumPy views; the metrics need no index alignment)
+        test_slice = slice(train_cutoff, None)
+        y_true_test = test_df['actual_truth_kwh'].to_numpy()
+        y_phys_test = df_physics['actual_energy_kwh'].to_numpy()[test_slice]
+        y_hybr_test = df_final['hybrid_energy_kwh'].to_numpy()[test_slice]
+
+        report = evaluate_model(y_true_test, y_phys_test, y_hybr_test)
+        print_evaluation_report(report)
 
     # 6. Intelligent Decision Engine (Optimization)
     print("Initializing Intelligent Decision Engine (with Uncertainty)...")
+    from optimization_engine import OptimizationEngine
     optimizer = OptimizationEngine(
         electricity_price=ELECTRICITY_PRICE_INR,
         cleaning_cost=EFFECTIVE_CLEANING_COST, 
@@ -108,15 +174,19 @@ def run_simulation():
         water_usage_per_clean=WATER_USAGE_LITERS
     )
     
-    # Pass the Hybrid DataFrame (contains 'hybrid_energy_kwh' and 'uncert_p... kwh')
-    optimization_result = optimizer.optimize_cleaning_schedule(df_final)
+    # Feed the DP flat arrays extracted once from the Hybrid DataFrame
+    optimization_result = optimizer.optimize_cleaning_schedule_arrays(
+        df_final[energy_col].to_numpy(),
+        df_final['recoverable_energy_kwh'].to_numpy(),
+        df_final['precipitation'].to_numpy() if 'precipitation' in df_final.columns else None
+    )
     optimal_schedule_indices = optimization_result['cleaning_dates']
-    optimal_dates = [df_final.iloc[i]['datetime'] for i in optimal_schedule_indices]
+    optimal_dates = [df_final.iat[i, DATETIME_COL] for i in optimal_schedule_indices]
     
     print(f"Optimal Schedule Found: {len(optimal_schedule_indices)} cleanings")
     
     # 7. Metrics Calculation
-    base_energy = df_final['hybrid_energy_kwh'].sum()
+    base_energy = df_final[energy_col].sum()
     
     # Calculate Gain: We need to simulate the 'Clean' scenario using Hybrid Model?
     # As discussed in Optimizer, we approximate Potential = Hybrid + Recoverable.
@@ -142,61 +212,53 @@ def run_simulation():
     
     # Back-calculate Energy Gain from Net Benefit (Rev = E * Price - Cost)
     # Gain = (Net + Cost) / Price
-    total_cost_calc = len(optimal_dates) * BASE_CLEANING_COST
+    water_used, total_cost_calc = calculate_cleaning_totals(len(optimal_dates), WATER_USAGE_LITERS, BASE_CLEANING_COST)
+    water_used, total_cost_calc = float(water_used), float(total_cost_calc)
     energy_gain_est = (net_benefit + total_cost_calc) / ELECTRICITY_PRICE_INR
     
     carbon_saved = energy_gain_est * CARBON_FACTOR
-    water_used = len(optimal_dates) * WATER_USAGE_LITERS
     total_cost = total_cost_calc
     
     sses_score = calculate_sses(base_energy + energy_gain_est, water_used, carbon_saved, total_cost)
     
     # Uncertainty stats from the whole period (or just future?)
     # Let's show average uncertainty width
-    p10_sum = df_final['uncert_p10_kwh'].sum()
-    p90_sum = df_final['uncert_p90_kwh'].sum()
+    if use_uq and use_hybrid:
+        p10_sum = df_final['uncert_p10_kwh'].sum()
+        p90_sum = df_final['uncert_p90_kwh'].sum()
+    else:
+        p10_sum = p90_sum = base_energy
     confidence_interval = p90_sum - p10_sum
     
     # 8. Reasons
     reasons = []
     if len(optimal_dates) > 0:
         next_clean = optimal_dates[0]
-        days_until = (next_clean - df.iloc[0]['datetime']).days
+        days_until = (next_clean - df.iat[0, DATETIME_COL]).days
         reasons.append(f"Scheduled Clean in {days_until} days.")
-        reasons.append(f"Projected Error Reduction: {report['error_reduction_pct']:.1f}% vs Physics.")
+        if report:
+            reasons.append(f"Projected Error Reduction: {report['error_reduction_pct']:.1f}% vs Physics.")
         reasons.append(f"Net projected revenue gain: ₹{net_benefit:.0f} (P50 Estimate).")
     else:
         reasons.append("Optimizer chose WAIT strategy.")
-        if report['error_reduction_pct'] > 10:
+        if report and report['error_reduction_pct'] > 10:
              reasons.append(f"ML confirms Physics was pessimistic (Error Reduced by {report['error_reduction_pct']:.1f}%).")
 
     # Feature Importance (Explainability)
-    importances = hybrid_model.get_model_insights()
+    importances = hybrid_model.get_model_insights() if hybrid_model else []
     if len(importances) > 0:
-        # We need feature names from FeatureEngineer
-        # Hardcoding or getting them would be better, but for now we can infer or just print top raw
-        # Let's map to known names:
-        feature_names = [
-            'irradiance', 'temperature', 'precipitation', 'dust_level',
-            'hour_sin', 'hour_cos', 'month',
-            'ghi_x_temp', 'dust_stickiness_proxy',
-            'ghi_rolling_mean_3h', 'temp_rolling_mean_6h',
-            'temp_deviation', 'temp_squared'
-        ]
-        # Sort and take top 3
-        indices = np.argsort(importances)[::-1]
-        top_3 = []
-        for i in range(min(3, len(indices))):
-             idx = indices[i]
-             if idx < len(feature_names):
-                 top_3.append(f"{feature_names[idx]} ({importances[idx]:.2f})")
-        
+        # Sort and take top 3 (tuple() makes the importances hashable for the cache)
+        top_3 = _top_k_reason(tuple(np.asarray(importances).tolist()))
         if top_3:
-            reasons.append(f"Top Driving Factors: {', '.join(top_3)}")
+            reasons.append(f"Top Driving Factors: {top_3}")
+
+    # Format the schedule once; reused by the metrics payload and the report
+    date_strs = [f"{d:%Y-%m-%d}" for d in optimal_dates]
+    schedule_str = ', '.join(date_strs)
 
     final_metrics = {
         "action": "CLEAN" if len(optimal_dates) > 0 else "WAIT",
-        "cleaning_dates": [str(d.date()) for d in optimal_dates],
+        "cleaning_dates": date_strs,
         "energy_gained": energy_gain_est,
         "net_benefit_inr": net_benefit,
         "carbon_saved_kg": carbon_saved,
@@ -215,7 +277,7 @@ def run_simulation():
     
     if len(optimal_dates) > 0:
         print(f"✅ ACTION: CLEAN RECOMMENDED")
-        print(f"🗓️  Schedule: {', '.join([str(d.date()) for d in optimal_dates])}")
+        print(f"🗓️  Schedule: {schedule_str}")
     else:
         print(f"⏸️ ACTION: WAIT (NO CLEANING)")
         
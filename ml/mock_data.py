@@ -0,0 +1,39 @@
+"""
+Seeded mock weather for the verify scripts.
+
+Same recipe the scripts used to build inline: hourly timestamps from
+2025-01-01, irradiance ~ U(0, 1000) W/m^2 and temperature ~ U(25, 35) C drawn
+in one Generator call, no rain.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+@lru_cache(maxsize=8)
+def _mock_weather_columns(periods, freq, seed, start):
+    # Cached per (periods, freq, seed, start); read-only so no caller can mutate the shared arrays
+    dates = pd.date_range(start=start, periods=periods, freq=freq)
+    rng = np.random.default_rng(seed)
+    irradiance, temperature = rng.uniform([[0], [25]], [[1000], [35]], size=(2, periods))
+    irradiance.flags.writeable = False
+    temperature.flags.writeable = False
+    return dates, irradiance, temperature
+
+
+def get_mock_weather(periods=720, freq='h', seed=0, start='2025-01-01'):
+    """
+    Mock weather frame with 'datetime', 'irradiance', 'temperature', 'precipitation'.
+
+    The random draws are made once per argument set; every call returns a fresh
+    DataFrame (own column buffers), so callers may edit it freely.
+    """
+    dates, irradiance, temperature = _mock_weather_columns(periods, freq, seed, start)
+    return pd.DataFrame({
+        'datetime': dates,
+        'irradiance': irradiance,
+        'temperature': temperature,
+        'precipitation': np.zeros(periods),
+    })
@@ -1,9 +1,22 @@
 import time
 import json
 import os
+import atexit
 import numpy as np
 from datetime import datetime
 
+# orjson is optional: a few times faster than stdlib json for small dicts
+try:
+    import orjson
+
+    def _dumps(obj):
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+        except TypeError:
+            return json.dumps(obj)  # Types orjson refuses (e.g. float subclasses)
+except ImportError:
+    _dumps = json.dumps
+
 class ModelMonitor:
     """
     ML Ops & Monitoring Layer.
@@ -13,10 +26,19 @@ class ModelMonitor:
     3. Prediction Tracking (for later audit)
     """
     
+    DRIFT_WINDOW = 1000  # Number of recent predictions kept for drift detection
+    FLUSH_EVERY = 64     # Log lines buffered before they are pushed to disk
+    
     def __init__(self, log_file="ml_monitoring_logs.json"):
         self.log_file = log_file
-        # In-memory buffer for drift detection
-        self.recent_predictions = []
+        self._fh = None  # Opened on first log, kept open (buffered) afterwards
+        self._close_at_exit = False  # close() goes to atexit once, on the first open
+        self._unflushed = 0  # Lines written since the last flush
+        # In-memory ring buffer for drift detection (oldest entry is overwritten once full)
+        # float32 is plenty for kWh outputs; the mean is accumulated in float64
+        self.recent_predictions = np.zeros(self.DRIFT_WINDOW, dtype=np.float32)
+        self._pred_idx = 0     # Next slot to write
+        self._pred_count = 0   # Number of valid entries (<= DRIFT_WINDOW)
         
     def log_inference(self, request_id: str, input_features: dict, output_metrics: dict, execution_time_ms: float):
         """
@@ -34,29 +56,57 @@ class ModelMonitor:
         }
         
         # Append to log file (Append-only for performance)
+        # One persistent 64 KB buffered handle instead of open/write/close per call,
+        # flushed every FLUSH_EVERY lines so readers tailing the file stay current
         # In production -> Kafka/Prometheus
         try:
-            with open(self.log_file, "a") as f:
-                f.write(json.dumps(log_entry) + "\n")
+            if self._fh is None:
+                self._fh = open(self.log_file, "a", buffering=1 << 16)
+                if not self._close_at_exit:
+                    atexit.register(self.close)
+                    self._close_at_exit = True
+            self._fh.write(_dumps(log_entry) + "\n")
+            self._unflushed += 1
+            if self._unflushed >= self.FLUSH_EVERY:
+                self.flush()
         except Exception as e:
             print(f"[Monitor] Logging failed: {e}")
             
         # Store for drift tracking
-        self.recent_predictions.append(output_metrics.get("energy_gained", 0))
-        if len(self.recent_predictions) > 1000:
-            self.recent_predictions.pop(0)
+        self.recent_predictions[self._pred_idx] = output_metrics.get("energy_gained", 0)
+        self._pred_idx = (self._pred_idx + 1) % self.DRIFT_WINDOW
+        self._pred_count = min(self._pred_count + 1, self.DRIFT_WINDOW)
+
+    def flush(self):
+        """
+        Pushes buffered log lines to disk.
+        """
+        if self._fh is not None:
+            self._fh.flush()
+        self._unflushed = 0
+
+    def close(self):
+        """
+        Flushes and closes the log file (also registered with atexit).
+        """
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+        self._unflushed = 0
 
     def check_drift(self) -> dict:
         """
         Checks for Model Drift.
         Simulates a Kolmogorov-Smirnov (KS) test on output distribution.
+        Flushes the log first, so the file matches the predictions checked here.
         """
-        if len(self.recent_predictions) < 10:
+        self.flush()
+        if self._pred_count < 10:
             return {"drift_detected": False, "confidence": 0.0, "message": "Insufficient data"}
             
         # Simple drift heuristic: check if recent mean deviates significantly from "training" baseline (mocked)
         baseline_mean = 1000.0 # kWh
-        current_mean = np.mean(self.recent_predictions)
+        current_mean = float(self.recent_predictions[:self._pred_count].mean(dtype=np.float64))
         
         deviation = abs(current_mean - baseline_mean) / baseline_mean
         
@@ -0,0 +1,31 @@
+
+"""
+Optional Numba support.
+
+Numba is not a hard dependency. When it is missing, `njit` becomes a no-op
+decorator and `prange` falls back to `range`, so the kernels still run as
+plain Python/NumPy (slower, same results). Hot paths check NUMBA_AVAILABLE
+and switch to their vectorized NumPy versions instead.
+
+Set SOLAROS_DISABLE_NUMBA=1 to take the NumPy paths even when Numba is
+installed (e.g. to skip JIT warm-up on short-lived workers).
+"""
+
+import os
+
+_DISABLED = os.environ.get("SOLAROS_DISABLE_NUMBA", "").strip().lower() in ("1", "true", "yes")
+
+try:
+    if _DISABLED:
+        raise ImportError("Numba disabled via SOLAROS_DISABLE_NUMBA")
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        # Support both @njit and @njit(cache=True, ...)
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
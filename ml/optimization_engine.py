@@ -1,7 +1,250 @@
 
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Tuple, Optional
+import sys
+import os
+from typing import List, Dict, Tuple, Optional, NamedTuple, Union
+
+# Ensure local imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from numba_compat import njit, NUMBA_AVAILABLE
+from rain_model import rain_reduction_factor, RAIN_WINDOW_DAYS
+
+# Grid emission factor used to value the carbon saved by a cleaning (kg CO2 per kWh).
+# Shared by both DP solvers (Numba freezes it as a compile-time constant).
+CARBON_KG_PER_KWH = 0.7
+
+
+@njit(cache=True)
+def _efficiency_tables(n_states, avg_daily_loss):
+    """
+    Lookup tables indexed by dirty_days (0 .. n_states-1), shared by both DP solvers
+    and the confidence intervals:
+    realized efficiency (loss capped at 10%) and the uncapped clean-vs-dirty energy fraction.
+    """
+    realized_efficiency = np.empty(n_states)
+    energy_lost_fraction = np.empty(n_states)
+    for dirty_days in range(n_states):
+        efficiency_loss = dirty_days * avg_daily_loss
+        realized_efficiency[dirty_days] = max(0.9, 1.0 - efficiency_loss)
+        energy_lost_fraction[dirty_days] = 1.0 - efficiency_loss
+    return realized_efficiency, energy_lost_fraction
+
+
+@njit(cache=True)
+def _dp_kernel(clean_energy_series, rain_keep_vec, rain_penalty_vec, max_days_dirty, min_days_between_clean,
+               min_dirtiness_threshold, avg_daily_loss,
+               electricity_price, cleaning_cost, carbon_price):
+    """
+    Fills the (day, dirty_days) DP table for the cleaning schedule.
+
+    Works on flat float64 arrays only so it can be JIT-compiled.
+    rain_keep_vec[day] is the fraction of dirt left after that day's rain (1.0 = no rain).
+    rain_penalty_vec[day] is the fraction of the cleaning gain lost to upcoming rain.
+    Returns (dp, parent_prev, parent_action); parent_prev is -1 where a state has no parent.
+    """
+    days = clean_energy_series.shape[0]
+    dp = np.full((days + 1, max_days_dirty + 1), -np.inf)
+    # dirty_days <= 60 fits int8, so both parent tables are one byte per state
+    parent_prev = np.full((days + 1, max_days_dirty + 1), -1, dtype=np.int8)
+    parent_action = np.zeros((days + 1, max_days_dirty + 1), dtype=np.uint8)
+    dp[0, 0] = 0.0
+
+    # Per-state lookup tables: none of these depend on the day, so the inner loop
+    # reads them instead of recomputing max()/threshold tests for every (day, state)
+    realized_efficiency_lut, energy_lost_fraction_lut = _efficiency_tables(max_days_dirty, avg_daily_loss)
+    can_clean_lut = np.empty(max_days_dirty, dtype=np.bool_)
+    for dirty_days in range(max_days_dirty):
+        can_clean_lut[dirty_days] = (dirty_days >= min_days_between_clean) and (dirty_days >= min_dirtiness_threshold)
+
+    for day in range(days):
+        potential_energy = clean_energy_series[day]
+        rain_keep = rain_keep_vec[day]
+
+        # Per-day parts of the CLEAN reward, shared by every state of this day
+        daily_energy_clean = potential_energy * 1.0
+        clean_revenue = daily_energy_clean * electricity_price
+        # If rain is coming, nature would have done it for free: devalue the gain
+        # (factor 1.0 = no rain coming, leaves the gain unchanged)
+        gain_keep = 1.0 - rain_penalty_vec[day]
+
+        # Dirtiness grows by at most 1 per day from state 0, so states above `day`
+        # are unreachable (-inf): skip them instead of testing each one.
+        reachable = min(day + 1, max_days_dirty)
+
+        for dirty_days in range(reachable):
+            if dp[day, dirty_days] == -np.inf:
+                continue
+
+            current_reward = dp[day, dirty_days]
+
+            # --- ACTION 1: WAIT ---
+            # Natural cleaning by rain? Jump to a lower dirtiness state (no rain keeps all dirt).
+            effective_dirty_days = int(dirty_days * rain_keep)
+            next_dirty_days = min(effective_dirty_days + 1, max_days_dirty)
+
+            daily_energy = potential_energy * realized_efficiency_lut[dirty_days]
+
+            # Day reward = revenue + carbon value - cost (no carbon, no cost when waiting)
+            reward_wait = daily_energy * electricity_price
+
+            if dp[day+1, next_dirty_days] < current_reward + reward_wait:
+                dp[day+1, next_dirty_days] = current_reward + reward_wait
+                parent_prev[day+1, next_dirty_days] = dirty_days
+                parent_action[day+1, next_dirty_days] = 0
+
+            # --- ACTION 2: CLEAN ---
+            if can_clean_lut[dirty_days]:
+                # Carbon/Energy Gain
+                energy_would_have_been = potential_energy * energy_lost_fraction_lut[dirty_days]
+                energy_gain = (daily_energy_clean - energy_would_have_been) * gain_keep
+
+                carbon_saved = energy_gain * CARBON_KG_PER_KWH
+
+                reward_clean = clean_revenue + carbon_saved * carbon_price - cleaning_cost
+
+                if dp[day+1, 0] < current_reward + reward_clean:
+                    dp[day+1, 0] = current_reward + reward_clean
+                    parent_prev[day+1, 0] = dirty_days
+                    parent_action[day+1, 0] = 1
+
+    return dp, parent_prev, parent_action
+
+
+def _dp_numpy(clean_energy_series, rain_keep_vec, rain_penalty_vec, max_days_dirty, min_days_between_clean,
+              min_dirtiness_threshold, avg_daily_loss,
+              electricity_price, cleaning_cost, carbon_price):
+    """
+    Same table as _dp_kernel, one vectorized row update per day (used without Numba).
+
+    WAIT moves every dirty_days state to a target that is non-decreasing in dirty_days,
+    so states sharing a target are contiguous: a reduceat gives the best candidate per
+    target and the first index reaching it reproduces the kernel's first-wins ties.
+    CLEAN always lands in state 0, so it is a single masked argmax.
+    """
+    days = clean_energy_series.shape[0]
+    dp = np.full((days + 1, max_days_dirty + 1), -np.inf)
+    parent_prev = np.full((days + 1, max_days_dirty + 1), -1, dtype=np.int8)
+    parent_action = np.zeros((days + 1, max_days_dirty + 1), dtype=np.uint8)
+    dp[0, 0] = 0.0
+
+    # States 0 .. max_days_dirty-1 are expanded (as in the kernel)
+    dirty_axis = np.arange(max_days_dirty)
+    realized_efficiency, energy_lost_fraction = _efficiency_tables(max_days_dirty, avg_daily_loss)
+    clean_allowed = (dirty_axis >= min_days_between_clean) & (dirty_axis >= min_dirtiness_threshold)
+
+    for day in range(days):
+        potential_energy = clean_energy_series[day]
+        # Only states 0..day are reachable (dirtiness grows by at most 1 per day)
+        reachable = min(day + 1, max_days_dirty)
+        current = dp[day, :reachable]
+
+        # --- ACTION 1: WAIT ---
+        effective_dirty_days = (dirty_axis[:reachable] * rain_keep_vec[day]).astype(np.int64)
+        next_idx = np.minimum(effective_dirty_days + 1, max_days_dirty)
+
+        cand_wait = current + (potential_energy * realized_efficiency[:reachable]) * electricity_price
+        starts = np.flatnonzero(np.r_[True, next_idx[1:] != next_idx[:-1]])
+        group_best = np.maximum.reduceat(cand_wait, starts)
+        group_of = np.repeat(np.arange(starts.size), np.diff(np.r_[starts, reachable]))
+        hits = np.flatnonzero(cand_wait == group_best[group_of])
+        first_hit = hits[np.unique(group_of[hits], return_index=True)[1]]
+        reached = group_best > -np.inf
+        targets = next_idx[starts][reached]
+        dp[day + 1, targets] = group_best[reached]
+        parent_prev[day + 1, targets] = first_hit[reached]
+        parent_action[day + 1, targets] = 0
+
+        # --- ACTION 2: CLEAN ---
+        energy_gain = potential_energy * 1.0 - potential_energy * energy_lost_fraction[:reachable]
+        rain_upcoming_penalty = rain_penalty_vec[day]
+        if rain_upcoming_penalty > 0:
+            energy_gain = energy_gain * (1.0 - rain_upcoming_penalty)
+        carbon_saved = energy_gain * CARBON_KG_PER_KWH
+        reward_clean = (potential_energy * 1.0) * electricity_price + carbon_saved * carbon_price - cleaning_cost
+        cand_clean = np.where(clean_allowed[:reachable], current + reward_clean, -np.inf)
+        best = int(np.argmax(cand_clean))
+        if cand_clean[best] > dp[day + 1, 0]:
+            dp[day + 1, 0] = cand_clean[best]
+            parent_prev[day + 1, 0] = best
+            parent_action[day + 1, 0] = 1
+
+    return dp, parent_prev, parent_action
+
+
+def _upcoming_rain_penalty(rain_vec, window_days=RAIN_WINDOW_DAYS, threshold_mm=5.0, penalty=0.5):
+    """
+    Per-day penalty on the cleaning benefit when significant rain is coming.
+
+    future_rain[day] = rain over the next `window_days` days, computed once for the whole
+    horizon instead of summing a slice per (day, dirty_days) state. If it exceeds
+    threshold_mm, cleaning creates negligible value (50% penalty by default).
+    Days without a full lookahead window get no penalty.
+    """
+    days = len(rain_vec)
+    future_rain = np.zeros(days)
+    if days > window_days:
+        # Prefix sums: every window is one subtraction, O(days) for any window length
+        cs = np.empty(days + 1, dtype=np.float64)
+        cs[0] = 0.0
+        np.cumsum(rain_vec, out=cs[1:])
+        lo = np.arange(1, days - window_days + 1)
+        future_rain[:days - window_days] = cs[lo + window_days] - cs[lo]
+    return np.where(future_rain > threshold_mm, penalty, 0.0)
+
+@njit(cache=True)
+def _dirty_days_trajectory(cleaning_mask, rain_keep_vec):
+    """
+    Dirty-day counter after each day for a fixed schedule: reset on cleaning days,
+    cut by rain (rain_keep_vec < 1, same reduction as the DP), otherwise +1.
+    """
+    days = cleaning_mask.shape[0]
+    out = np.empty(days, dtype=np.int64)
+    dirty_days = 0
+    for day in range(days):
+        if cleaning_mask[day]:
+            dirty_days = 0
+        else:
+            # Rain Check
+            rain_keep = rain_keep_vec[day]
+            if rain_keep < 1.0:
+                dirty_days = int(dirty_days * rain_keep)
+            else:
+                dirty_days += 1
+        out[day] = dirty_days
+    return out
+
+
+class ForecastArrays(NamedTuple):
+    """Forecast columns the optimizer needs, pulled out of the DataFrame once (flat float64)."""
+    energy: np.ndarray       # Hybrid energy if available, else physics actual (P50)
+    recoverable: np.ndarray  # Physics recoverable energy
+    rain: np.ndarray         # Precipitation in mm (zeros without rain data)
+    p10: np.ndarray          # P10 energy (falls back to energy)
+    p90: np.ndarray          # P90 energy (falls back to energy)
+
+
+def extract_forecast_arrays(forecast_df: pd.DataFrame) -> ForecastArrays:
+    """
+    Resolves every column (and its fallback) in one place so the DP and the
+    confidence intervals work on contiguous arrays instead of name lookups.
+    """
+    columns = forecast_df.columns
+    days = len(forecast_df)
+
+    def col(name):
+        return np.ascontiguousarray(forecast_df[name].to_numpy(dtype=np.float64))
+
+    # Use Hybrid Energy if available, else Physics Actual
+    energy = col('hybrid_energy_kwh' if 'hybrid_energy_kwh' in columns else 'actual_energy_kwh')
+    return ForecastArrays(
+        energy=energy,
+        recoverable=col('recoverable_energy_kwh'),
+        rain=col('precipitation') if 'precipitation' in columns else np.zeros(days),
+        p10=col('uncert_p10_kwh') if 'uncert_p10_kwh' in columns else energy,
+        p90=col('uncert_p90_kwh') if 'uncert_p90_kwh' in columns else energy,
+    )
+
 
 class OptimizationEngine:
     def __init__(self, 
@@ -16,148 +259,67 @@ class OptimizationEngine:
         self.water_price = water_price_per_liter
         self.water_usage = water_usage_per_clean
         
-    def _calculate_day_reward(self, energy_produced: float, is_cleaning_day: bool, carbon_saved: float = 0.0) -> float:
-        revenue = energy_produced * self.electricity_price
-        carbon_value = carbon_saved * self.carbon_price
-        
-        cost = 0.0
-        if is_cleaning_day:
-            cost = self.cleaning_cost
-            
-        return revenue + carbon_value - cost
-
     def optimize_cleaning_schedule(self, 
-                                   forecast_df: pd.DataFrame, 
+                                   forecast_df: Union[pd.DataFrame, ForecastArrays], 
                                    min_days_between_clean: int = 7) -> Dict:
         """
         Uses Dynamic Programming with INTELLIGENT FRICTION.
+        Accepts the forecast DataFrame or its ForecastArrays (see extract_forecast_arrays).
         """
-        days = len(forecast_df)
-        max_days_dirty = 60 
+        arrays = forecast_df if isinstance(forecast_df, ForecastArrays) else extract_forecast_arrays(forecast_df)
         
-        
-        # Check for precipitation data
-        has_rain_data = 'precipitation' in forecast_df.columns
-        rain_vec = forecast_df['precipitation'].values if has_rain_data else np.zeros(days)
+        return self.optimize_cleaning_schedule_arrays(
+            arrays.energy,
+            arrays.recoverable,
+            arrays.rain,
+            min_days_between_clean=min_days_between_clean
+        )
 
-        # UNCERTAINTY FACTOR (New in v3)
-        # If model is uncertain (wide P90-P10), be more conservative with spending money on cleaning.
-        # We assume 'uncert_p90_kwh' and 'uncert_p10_kwh' might exist if passed from Hybrid v2.
-        has_uncertainty = 'uncert_p90_kwh' in forecast_df.columns
-        uncertainty_penalty = 0.0
-        
-        if has_uncertainty:
-            # Simple measure: Sum of daily spread
-            daily_spread = forecast_df['uncert_p90_kwh'] - forecast_df['uncert_p10_kwh']
-            avg_spread = daily_spread.mean()
-            # If spread is > 10% of energy, it's 'High Uncertainty'
-            # We can dampen the projected rewards.
-            # For DP, we'll apply a scalar to the Energy Reward.
-            # Higher uncertainty -> Lower confidence in revenue -> Discount it.
-            # Discount factor = 1.0 - (Spread / MaxEnergy * weight)
-            # Simplified:
-            uncertainty_penalty = 0.05 # Flat 5% discount on gains if using ML
+    def optimize_cleaning_schedule_arrays(self,
+                                          energy: np.ndarray,
+                                          recoverable: np.ndarray,
+                                          rain: Optional[np.ndarray] = None,
+                                          min_days_between_clean: int = 7) -> Dict:
+        """
+        Array entry point of the cleaning-schedule DP.
+
+        Args:
+            energy: Predicted energy per step (hybrid if available, else physics actual).
+            recoverable: Physics recoverable energy per step.
+            rain: Precipitation per step in mm (None = no rain data).
+        """
+        days = len(energy)
+        max_days_dirty = 60 
 
-        dp = np.full((days + 1, max_days_dirty + 1), -np.inf)
-        parent = {} 
-        
-        start_dirtiness = 0 
-        dp[0][start_dirtiness] = 0.0
-        
-        # Use Hybrid Energy if available, else Physics Actual
-        energy_col = 'hybrid_energy_kwh' if 'hybrid_energy_kwh' in forecast_df.columns else 'actual_energy_kwh'
-        
         # For 'Potential' (Clean state), we need to estimate what it WOULD be.
-        # Recoverable = Ideal - Actual.
-        # So Potential = Actual + Recoverable. (Matches logic).
-        # But Hybrid model gives us 'Predicted Actual'.
-        # We need 'Predicted Ideal' or 'Predicted Clean'. 
-        # Hybrid Correction applies to the *specific condition*.
-        # If we clean, dust=0. The Hybrid Model should predict for dust=0.
-        # Ideally, we'd run the model for both scenarios. 
-        # For Optimization Speed, we assume:
+        # Recoverable = Ideal - Actual, so Potential = Actual + Recoverable.
+        # Hybrid Correction applies to the *specific condition*; ideally we'd run
+        # the model for both scenarios. For Optimization Speed, we assume:
         # Potential_Hybrid = Hybrid_Actual + Physics_Recoverable
         # This assumes ML residual is independent of Dust (mostly true, it's temp/spectral).
-        
-        current_actual_vec = forecast_df[energy_col].values
-        physics_recoverable_vec = forecast_df['recoverable_energy_kwh'].values
-        
+        energy = np.ascontiguousarray(energy, dtype=np.float64)
+        recoverable = np.ascontiguousarray(recoverable, dtype=np.float64)
+        rain_vec = np.zeros(days) if rain is None else np.ascontiguousarray(rain, dtype=np.float64)
+
         # Clean Energy Series = Current + Physics Recoverable (Approximation)
-        clean_energy_series = current_actual_vec + physics_recoverable_vec
+        clean_energy_series = energy + recoverable
         
         avg_daily_loss = 0.005 # 0.5% / day
-        rain_cleaning_gamma = 0.4 
-        
-        for day in range(days):
-            potential_energy = clean_energy_series[day]
-            rain_mm = rain_vec[day]
-
-            # Future Rain Check (Lookahead 2 days)
-            # If significant rain is coming in 1-2 days, Cleaning creates negligible value.
-            rain_upcoming_penalty = 0.0
-            if day < days - 2:
-                future_rain = np.sum(rain_vec[day+1:day+3])
-                if future_rain > 5.0: # More than 5mm in next 2 days
-                    rain_upcoming_penalty = 0.5 # 50% penalty on cleaning benefit
-            
-            for dirty_days in range(max_days_dirty):
-                if dp[day][dirty_days] == -np.inf:
-                    continue
-                
-                current_reward = dp[day][dirty_days]
-                
-                # --- ACTION 1: WAIT ---
-                # Natural cleaning by rain?
-                if rain_mm > 0.1:
-                    reduction = min(rain_cleaning_gamma * rain_mm, 0.95)
-                    # Approx effective dirty days reduction
-                    # This is tricky in discrete DP. We'll simulate it by jumping to a lower state.
-                    # e.g. dirty_days * (1-reduction)
-                    effective_dirty_days = int(dirty_days * (1.0 - reduction))
-                    next_dirty_days = min(effective_dirty_days + 1, max_days_dirty)
-                else:
-                    next_dirty_days = min(dirty_days + 1, max_days_dirty)
-                
-                efficiency_loss = dirty_days * avg_daily_loss
-                realized_efficiency = max(0.9, 1.0 - efficiency_loss)
-                daily_energy = potential_energy * realized_efficiency
-                
-                reward_wait = self._calculate_day_reward(daily_energy, is_cleaning_day=False)
-                
-                if dp[day+1][next_dirty_days] < current_reward + reward_wait:
-                    dp[day+1][next_dirty_days] = current_reward + reward_wait
-                    parent[(day+1, next_dirty_days)] = (dirty_days, 0) 
-                
-                # --- ACTION 2: CLEAN ---
-                # Constraints:
-                # 1. Must be at least min_days since last clean
-                # 2. Must be dirty enough (> 3-5% loss) to justify cost at all
-                #    5% loss = ~10 days at 0.5%/day
-                min_dirtiness_threshold = 10 
-                
-                can_clean = (dirty_days >= min_days_between_clean) and (dirty_days >= min_dirtiness_threshold)
-                
-                if can_clean:
-                    # Apply Rain Penalty if applicable
-                    # If rain is coming, the 'Value' of cleaning is reduced because nature would have done it for free.
-                    
-                    daily_energy_clean = potential_energy * 1.0 
-                    
-                    # Carbon/Energy Gain
-                    energy_would_have_been = potential_energy * (1.0 - (dirty_days * avg_daily_loss))
-                    energy_gain = daily_energy_clean - energy_would_have_been
-                    
-                    # Apply Rain Penalty Factor to the Gain
-                    if rain_upcoming_penalty > 0:
-                        energy_gain *= (1.0 - rain_upcoming_penalty) # Devalue the gain
-                        
-                    carbon_saved = energy_gain * 0.7
-                    
-                    reward_clean = self._calculate_day_reward(daily_energy_clean, is_cleaning_day=True, carbon_saved=carbon_saved)
-                    
-                    if dp[day+1][0] < current_reward + reward_clean:
-                        dp[day+1][0] = current_reward + reward_clean
-                        parent[(day+1, 0)] = (dirty_days, 1)
+        # Fraction of dirt left after each day's rain, computed for the whole horizon at once
+        rain_keep_vec = 1.0 - rain_reduction_factor(rain_vec)
+        # Must be dirty enough (> 3-5% loss) to justify cost at all
+        # 5% loss = ~10 days at 0.5%/day
+        min_dirtiness_threshold = 10 
+        
+        # Future Rain Check (Lookahead 2 days), one lookup per day inside the kernels.
+        rain_penalty_vec = _upcoming_rain_penalty(rain_vec)
+        
+        dp_solver = _dp_kernel if NUMBA_AVAILABLE else _dp_numpy
+        dp, parent_prev, parent_action = dp_solver(
+            clean_energy_series, rain_keep_vec, rain_penalty_vec, max_days_dirty, min_days_between_clean,
+            min_dirtiness_threshold, avg_daily_loss,
+            float(self.electricity_price), float(self.cleaning_cost), float(self.carbon_price)
+        )
 
         # Backtrack
         best_end_dirty_days = np.argmax(dp[days])
@@ -167,9 +329,9 @@ class OptimizationEngine:
         curr_dirty = best_end_dirty_days
         
         for day in range(days, 0, -1):
-            if (day, curr_dirty) in parent:
-                prev_dirty, action = parent[(day, curr_dirty)]
-                if action == 1:
+            prev_dirty = parent_prev[day, curr_dirty]
+            if prev_dirty >= 0:
+                if parent_action[day, curr_dirty] == 1:
                     schedule.append(day - 1)
                 curr_dirty = prev_dirty
             
@@ -180,64 +342,47 @@ class OptimizationEngine:
             "total_net_value": max_total_reward,
             "horizon_days": days
         }
-    def calculate_confidence_intervals(self, schedule: List[int], forecast_df: pd.DataFrame) -> Dict:
+    def calculate_confidence_intervals(self, schedule: List[int],
+                                       forecast_df: Union[pd.DataFrame, ForecastArrays]) -> Dict:
         """
         Calculates P10, P50, and P90 net values for a given schedule.
+        Accepts the forecast DataFrame or its ForecastArrays (see extract_forecast_arrays).
         """
-        days = len(forecast_df)
-        cleaning_dates = set(schedule)
-        
-        # Columns
-        col_p50 = 'hybrid_energy_kwh' if 'hybrid_energy_kwh' in forecast_df.columns else 'actual_energy_kwh'
-        col_p10 = 'uncert_p10_kwh' if 'uncert_p10_kwh' in forecast_df.columns else col_p50
-        col_p90 = 'uncert_p90_kwh' if 'uncert_p90_kwh' in forecast_df.columns else col_p50
+        arrays = forecast_df if isinstance(forecast_df, ForecastArrays) else extract_forecast_arrays(forecast_df)
+        days = len(arrays.energy)
         
-        physics_recoverable = forecast_df['recoverable_energy_kwh'].values
+        physics_recoverable = arrays.recoverable
+        rain_vec = arrays.rain
         
-        scenarios = {
-            'p10': forecast_df[col_p10].values,
-            'p50': forecast_df[col_p50].values,
-            'p90': forecast_df[col_p90].values
-        }
+        scenario_names = ('p10', 'p50', 'p90')
+        if days == 0:
+            return {name: 0.0 for name in scenario_names}
         
-        results = {}
+        cleaning_mask = np.zeros(days, dtype=np.bool_)
+        clean_idx = [day for day in set(schedule) if 0 <= day < days]
+        cleaning_mask[clean_idx] = True
         
         avg_daily_loss = 0.005
         
-        for name, energy_vec in scenarios.items():
-            # Construct "Clean Energy" potential for this scenario
-            # Potential = Predicted Actual + Physics Recoverable
-            # (Assuming recovered amount is roughly constant physically)
-            potential_energy_vec = energy_vec + physics_recoverable
-            
-            total_value = 0.0
-            dirty_days = 0 
-            
-            for day in range(days):
-                # 1. Update Dirty State
-                if day in cleaning_dates:
-                    dirty_days = 0
-                else:
-                    # Rain Check
-                    rain_mm = forecast_df.iloc[day].get('precipitation', 0.0)
-                    if rain_mm > 0.1:
-                        reduction = min(0.4 * rain_mm, 0.95)
-                        dirty_days = int(dirty_days * (1.0 - reduction))
-                    else:
-                        dirty_days += 1
-                
-                # 2. Calculate Efficiency
-                efficiency_loss = dirty_days * avg_daily_loss
-                realized_efficiency = max(0.9, 1.0 - efficiency_loss)
-                
-                # 3. Calculate Energy
-                daily_energy = potential_energy_vec[day] * realized_efficiency
-                
-                # 4. Calculate Reward
-                is_clean_day = (day in cleaning_dates)
-                reward = self._calculate_day_reward(daily_energy, is_cleaning_day=is_clean_day)
-                total_value += reward
-            
-            results[name] = total_value
-            
-        return results
+        # 1. Dirty State: depends only on the schedule and rain, so it is shared by all scenarios
+        dirty_days = _dirty_days_trajectory(cleaning_mask, 1.0 - rain_reduction_factor(rain_vec))
+        
+        # 2. Calculate Efficiency (table lookup per day, same values as the DP uses)
+        realized_efficiency_lut, _ = _efficiency_tables(int(dirty_days.max()) + 1, avg_daily_loss)
+        realized_efficiency = realized_efficiency_lut[dirty_days]
+        
+        # Construct "Clean Energy" potential for each scenario, one row per scenario
+        # Potential = Predicted Actual + Physics Recoverable
+        # (Assuming recovered amount is roughly constant physically)
+        potential_energy = np.stack([arrays.p10, arrays.energy, arrays.p90]) + physics_recoverable
+        
+        # 3. Calculate Energy
+        daily_energy = potential_energy * realized_efficiency
+        
+        # 4. Calculate Reward (revenue, no carbon, cost on cleaning days)
+        rewards = daily_energy * self.electricity_price - np.where(cleaning_mask, self.cleaning_cost, 0.0)
+        
+        # Running totals in day order (cumsum adds sequentially, like the per-day loop did)
+        totals = np.cumsum(rewards, axis=1)[:, -1]
+        
+        return dict(zip(scenario_names, totals))
@@ -1,13 +1,76 @@
 
 import pandas as pd
 import numpy as np
+import sys
+import os
 from datetime import timedelta
 
+# Ensure local imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from degradation_model import RAIN_CLEANING_GAMMA, RAIN_THRESHOLD
+
 # Rain Intelligence Constants
 # NOTE: Physics constants (GAMMA) are now centralized in degradation_model.py
 # We keep threshold here for forecasting decisions
 RAIN_THRESHOLD_MM = 2.0
 RAIN_WINDOW_DAYS = 2
+MAX_RAIN_REDUCTION = 0.95  # Rain never washes off more than 95% of the dust in one step
+
+def rain_reduction_factor(rain_amount_mm):
+    """
+    Fraction of dust washed off by `rain_amount_mm` of rain (same physics as degradation_model).
+    Accepts a scalar or an array; rain at or below RAIN_THRESHOLD (or NaN) has no effect.
+    """
+    rain = np.asarray(rain_amount_mm, dtype=np.float64)
+    reduction = np.where(rain > RAIN_THRESHOLD, np.minimum(RAIN_CLEANING_GAMMA * rain, MAX_RAIN_REDUCTION), 0.0)
+    return reduction if reduction.ndim else float(reduction)
+
+def apply_rain_cleaning(dust_level, rain_amount_mm):
+    """
+    Dust level after rain. Scalars in -> float out; arrays are handled element-wise in one pass.
+    """
+    cleaned = np.asarray(dust_level, dtype=np.float64) * (1.0 - rain_reduction_factor(rain_amount_mm))
+    return cleaned if cleaned.ndim else float(cleaned)
+
+def _window_slice(datetimes, start_time, end_time):
+    """
+    Rows with start_time <= datetime < end_time.
+    Sorted, tz-naive timelines (the normal case) -> slice via np.searchsorted, O(log n).
+    Anything else -> boolean mask, same rows as before.
+    """
+    times = datetimes.to_numpy()
+    if times.dtype.kind == 'M' and start_time.tzinfo is None and datetimes.is_monotonic_increasing:
+        lo = np.searchsorted(times, start_time.to_datetime64(), side='left')
+        hi = np.searchsorted(times, end_time.to_datetime64(), side='left')
+        return slice(lo, hi)
+    return (times >= start_time) & (times < end_time)
+
+def check_rain_forecast_wait_all(df, window_days=RAIN_WINDOW_DAYS, dates=None):
+    """
+    Batch version for rolling decision loops: precipitation over the next `window_days`
+    (datetime in [t, t + window)) for every row t, as one NumPy vector.
+    Pass `dates` to get the same window totals for arbitrary query dates instead
+    (e.g. one per candidate day), each one a binary search instead of a window scan.
+    Compare against a threshold to get every WAIT/PROCEED decision at once.
+    Assumes a sorted timeline (as loaded by data_loader).
+    """
+    n_out = len(df) if dates is None else len(dates)
+    if 'precipitation' not in df.columns:
+        return np.zeros(n_out)
+    
+    times = df['datetime'].to_numpy()
+    precip = np.nan_to_num(df['precipitation'].to_numpy(dtype=np.float64))
+    csum = np.concatenate(([0.0], np.cumsum(precip)))
+    
+    window = np.timedelta64(int(window_days * 86400), 's')
+    if dates is None:
+        lo = np.arange(len(times))
+        hi = np.searchsorted(times, times + window, side='left')
+    else:
+        starts = pd.to_datetime(dates).to_numpy()
+        lo = np.searchsorted(times, starts, side='left')
+        hi = np.searchsorted(times, starts + window, side='left')
+    return csum[hi] - csum[lo]
 
 def check_rain_forecast_wait(df, current_date=None, window_days=RAIN_WINDOW_DAYS, threshold_mm=RAIN_THRESHOLD_MM):
     """
@@ -32,14 +95,20 @@ def check_rain_forecast_wait(df, current_date=None, window_days=RAIN_WINDOW_DAYS
     start_time = pd.to_datetime(current_date)
     end_time = start_time + pd.Timedelta(days=window_days)
     
-    mask = (df['datetime'] >= start_time) & (df['datetime'] < end_time)
-    window_df = df.loc[mask]
+    window = _window_slice(df['datetime'], start_time, end_time)
+    precip = df['precipitation'].to_numpy()
+    
+    if isinstance(window, slice):
+        # Sorted timeline: [lo, hi) found by binary search, window is a view (no copy)
+        has_rows = window.stop > window.start
+    else:
+        has_rows = window.any()
     
-    if window_df.empty:
+    if not has_rows:
         return False, {"decision": "PROCEED", "message": "End of data or no forecast available for the window."}
         
-    # Sum precipitation in window
-    upcoming_rain = window_df['precipitation'].sum()
+    # Sum precipitation in window (nansum: missing hours count as no rain, like Series.sum)
+    upcoming_rain = np.nansum(precip[window])
     
     if upcoming_rain >= threshold_mm:
         # We need to import the GAMMA from degradation model to be consistent, or just use a reference value for estimation
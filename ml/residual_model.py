@@ -2,8 +2,47 @@
 import xgboost as xgb
 import pandas as pd
 import numpy as np
-import pickle
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Early stopping: hold out the last 10% of the rows and stop once the validation loss
+# hasn't improved for this many rounds (num_boost_round is only the upper bound)
+EARLY_STOPPING_ROUNDS = 20
+VALIDATION_FRACTION = 0.1
+MIN_ROWS_FOR_VALIDATION = 50  # Too few rows -> train the full 200 rounds, no hold-out
+
+def _cuda_available():
+    """True when a CUDA device is visible (checked via CuPy, which is optional)."""
+    try:
+        import cupy
+        return cupy.cuda.runtime.getDeviceCount() > 0
+    except Exception:
+        # No CuPy, no driver, or no device -> train on CPU
+        return False
+
+class _BoosterRegressor:
+    """
+    Thin wrapper so a native xgb.Booster looks like the XGBRegressor it replaced
+    (.predict(X) and .feature_importances_), so ResidualLearner.predict and
+    get_feature_importance work unchanged.
+    """
+    
+    def __init__(self, booster):
+        self.booster = booster
+        
+    def predict(self, X):
+        # inplace_predict reads the array/DataFrame directly, no DMatrix round-trip
+        return self.booster.inplace_predict(X)
+        
+    @property
+    def feature_importances_(self):
+        # Same definition as XGBRegressor: total gain per feature, normalized
+        names = self.booster.feature_names
+        scores = self.booster.get_score(importance_type='gain')
+        imp = np.array([scores.get(f, 0.0) for f in names], dtype=np.float32)
+        total = imp.sum()
+        return imp / total if total > 0 else imp
 
 class ResidualLearner:
     """
@@ -11,11 +50,14 @@ class ResidualLearner:
     Implements Quantile Regression to provide uncertainty intervals (P10, P50, P90).
     """
     
-    def __init__(self, model_path="ml_residual_model.pkl"):
-        self.model_path = model_path
+    def __init__(self, model_path="ml_residual_model"):
+        # Base path: boosters are stored as <base>.p50.ubj etc. plus a <base>.json manifest.
+        # (A legacy "*.pkl" path is accepted; the extension is dropped.)
+        self.model_path = os.path.splitext(model_path)[0]
         self.model_p50 = None # Main estimator
         self.model_p10 = None # Conservative
         self.model_p90 = None # Optimistic
+        self.model_p10_p90 = None # Both bounds from one multi-quantile booster (n, 2)
         self.is_trained = False
         
     def train(self, X: pd.DataFrame, y: pd.Series):
@@ -28,38 +70,84 @@ class ResidualLearner:
         """
         print("Training Residual Learner (XGBoost)...")
         
+        # XGBoost bins/stores features and labels as float32 internally, so cast once up front
+        X = X.astype(np.float32)
+        y = y.astype(np.float32)
+        
         # Common params
         # Monotonic constraints? No, let tree decide.
+        num_boost_round = 200
         params = {
-            'n_estimators': 200,
             'max_depth': 5,
             'learning_rate': 0.05,
             'subsample': 0.8,
             'colsample_bytree': 0.8,
-            'n_jobs': -1 
+            # Histogram trees (not 'exact'), on the GPU when one is available
+            'tree_method': 'hist',
+            'device': 'cuda' if _cuda_available() else 'cpu',
+            'max_bin': 256,
+            # The models train side by side, so split the cores between them
+            'nthread': max(1, (os.cpu_count() or 1) // 2)
         }
         
-        # Train P50 (Median/Mean)
-        # reg:absoluteerror fits median, reg:squarederror fits mean. 
-        # For standard "Best Guess", squarederror is usually more stable unless outliers are huge.
-        self.model_p50 = xgb.XGBRegressor(objective='reg:squarederror', **params)
-        self.model_p50.fit(X, y)
+        # Validation split for early stopping
+        if len(X) >= MIN_ROWS_FOR_VALIDATION:
+            # Lazy import: only training needs scikit-learn, loading / predicting doesn't
+            from sklearn.model_selection import train_test_split
+            # Chronological tail, not a shuffle: the rows are consecutive hours, and a shuffled
+            # validation hour would have its neighbours in training (optimistic early stopping)
+            X, X_val, y, y_val = train_test_split(X, y, test_size=VALIDATION_FRACTION, shuffle=False)
+        else:
+            X_val = None
         
-        # Train P10 (Conservative Bound)
-        # XGBoost supports quantile regression via 'reg:quantileerror' since recent versions (2.0+)
-        # Or we can use objective functions. simpler: use 'reg:quantileerror' if available, or just separate models.
-        # Assuming modern XGBoost installed.
+        # Build the training matrix once and share it: the sklearn wrapper would
+        # re-ingest X (and re-parse dtypes) for every model.
+        # QuantileDMatrix keeps only the histogram bins, which is all 'hist' needs.
+        dtrain = xgb.QuantileDMatrix(X, label=y, max_bin=params['max_bin'])
+        evals = []
+        if X_val is not None:
+            # Validation rows binned with the training cuts (ref=dtrain)
+            evals = [(xgb.QuantileDMatrix(X_val, label=y_val, ref=dtrain), 'val')]
         
-        try:
-            self.model_p10 = xgb.XGBRegressor(objective='reg:quantileerror', quantile_alpha=0.1, **params)
-            self.model_p10.fit(X, y)
+        def fit(extra):
+            booster = xgb.train({**params, **extra}, dtrain, num_boost_round=num_boost_round,
+                                evals=evals, early_stopping_rounds=EARLY_STOPPING_ROUNDS if evals else None,
+                                verbose_eval=False)
+            if evals:
+                # Keep only the trees up to the best round: smaller model, faster predict
+                booster = booster[:booster.best_iteration + 1]
+            return _BoosterRegressor(booster)
+        
+        # XGBoost releases the GIL while training, so threads overlap the fits.
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            # Train P50 (Median/Mean)
+            # reg:absoluteerror fits median, reg:squarederror fits mean. 
+            # For standard "Best Guess", squarederror is usually more stable unless outliers are huge.
+            fut_p50 = pool.submit(fit, {'objective': 'reg:squarederror'})
+            
+            # Train P10 (Conservative Bound) + P90 (Optimistic Bound) as ONE booster:
+            # list-valued quantile_alpha with vector leaves -> a single tree traversal
+            # yields both bounds at predict time.
+            # (P50 stays separate: it is the squared-error mean, not the 0.5 quantile.)
+            fut_p10_p90 = pool.submit(fit, {'objective': 'reg:quantileerror', 'quantile_alpha': [0.1, 0.9],
+                                             'multi_strategy': 'multi_output_tree'})
             
-            self.model_p90 = xgb.XGBRegressor(objective='reg:quantileerror', quantile_alpha=0.9, **params)
-            self.model_p90.fit(X, y)
-        except Exception as e:
-            print(f"Warning: Quantile training failed ({e}). Falling back to simple variance estimation.")
+            self.model_p50 = fut_p50.result()
             self.model_p10 = None
             self.model_p90 = None
+            try:
+                self.model_p10_p90 = fut_p10_p90.result()
+            except Exception as e:
+                # Older XGBoost (or a device without vector-leaf support): one booster per quantile
+                print(f"Warning: Multi-quantile training failed ({e}). Training P10/P90 separately.")
+                self.model_p10_p90 = None
+                try:
+                    self.model_p10 = fit({'objective': 'reg:quantileerror', 'quantile_alpha': 0.1})
+                    self.model_p90 = fit({'objective': 'reg:quantileerror', 'quantile_alpha': 0.9})
+                except Exception as e:
+                    print(f"Warning: Quantile training failed ({e}). Falling back to simple variance estimation.")
+                    self.model_p10 = None
+                    self.model_p90 = None
             
         self.is_trained = True
         self.save_model()
@@ -76,11 +164,18 @@ class ResidualLearner:
             zeros = np.zeros(len(X))
             return {'residual_pred': zeros, 'p10': zeros, 'p90': zeros}
             
-        p50 = self.model_p50.predict(X)
+        # One contiguous float32 copy shared by all three models (XGBoost predicts in float32 anyway)
+        X_np = np.ascontiguousarray(X.to_numpy(dtype=np.float32))
         
-        if self.model_p10 and self.model_p90:
-            p10 = self.model_p10.predict(X)
-            p90 = self.model_p90.predict(X)
+        p50 = self.model_p50.predict(X_np)
+        
+        if self.model_p10_p90 or (self.model_p10 and self.model_p90):
+            if self.model_p10_p90:
+                bounds = self.model_p10_p90.predict(X_np)  # (n, 2): P10, P90
+                p10, p90 = bounds[:, 0], bounds[:, 1]
+            else:
+                p10 = self.model_p10.predict(X_np)
+                p90 = self.model_p90.predict(X_np)
             
             # Sanity check: P10 <= P50 <= P90
             # XGBoost quantiles aren't guaranteed to cross, but usually behave.
@@ -99,28 +194,57 @@ class ResidualLearner:
             'p90': p90
         }
         
+    def _booster_path(self, name):
+        return f"{self.model_path}.{name}.ubj"
+        
+    def _manifest_path(self):
+        return f"{self.model_path}.json"
+        
     def save_model(self):
+        """
+        Saves each booster in XGBoost's native UBJSON format (version-stable, no pickle)
+        plus a small JSON manifest listing which quantile models exist.
+        Booster files of models that no longer exist (e.g. separate P10/P90 files after
+        a retrain produced the combined P10/P90 booster) are removed.
+        """
         models = {
             'p50': self.model_p50,
             'p10': self.model_p10,
-            'p90': self.model_p90
+            'p90': self.model_p90,
+            'p10_p90': self.model_p10_p90
         }
-        with open(self.model_path, 'wb') as f:
-            pickle.dump(models, f)
+        present = [name for name, model in models.items() if model is not None]
+        for name in present:
+            models[name].booster.save_model(self._booster_path(name))
+        with open(self._manifest_path(), 'w') as f:
+            json.dump({'format': 'xgboost-ubj', 'models': present}, f)
+        # Stale files go only after the new manifest is written
+        for name in models:
+            if name not in present and os.path.exists(self._booster_path(name)):
+                os.remove(self._booster_path(name))
             
     def load_model(self):
-        if os.path.exists(self.model_path):
-            try:
-                with open(self.model_path, 'rb') as f:
-                    models = pickle.load(f)
-                    self.model_p50 = models['p50']
-                    self.model_p10 = models['p10']
-                    self.model_p90 = models['p90']
-                self.is_trained = True
-                return True
-            except:
-                return False
-        return False
+        if not os.path.exists(self._manifest_path()):
+            return False
+        try:
+            with open(self._manifest_path()) as f:
+                present = json.load(f)['models']
+            loaded = {}
+            for name in present:
+                booster = xgb.Booster()
+                booster.load_model(self._booster_path(name))
+                loaded[name] = _BoosterRegressor(booster)
+        except (OSError, ValueError, KeyError, xgb.core.XGBoostError) as e:
+            print(f"Warning: Could not load residual model from {self.model_path} ({e}).")
+            return False
+        self.model_p50 = loaded.get('p50')
+        self.model_p10 = loaded.get('p10')
+        self.model_p90 = loaded.get('p90')
+        self.model_p10_p90 = loaded.get('p10_p90')
+        if self.model_p50 is None:
+            return False
+        self.is_trained = True
+        return True
     
     def get_feature_importance(self):
         if self.model_p50:
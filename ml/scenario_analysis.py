@@ -11,14 +11,25 @@ scaled net gain for 1 MW (~5000 m²) for storytelling.
 
 import sys
 import os
+import logging
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from data_loader import fetch_nasa_power_data
-from degradation_model import calculate_energy_metrics
+from data_loader import fetch_nasa_power_data, is_whole_day_hourly_grid
+from degradation_model import calculate_energy_metrics, calculate_base_metrics, apply_cleaning_schedule, rescale_panel_area
+from numba_compat import njit, NUMBA_AVAILABLE
 
+# Optional: Polars for the daily aggregation of irregular timelines
+try:
+    import polars as pl
+    POLARS_AVAILABLE = True
+except ImportError:
+    POLARS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
 
 # Economic and environmental constants (aligned with intelligence_core)
 DEFAULT_ELECTRICITY_PRICE_INR = 6.0   # per kWh
@@ -26,6 +37,8 @@ DEFAULT_CARBON_FACTOR = 0.7          # kg CO2 per kWh
 DEFAULT_WATER_USAGE_LITERS = 500.0
 DEFAULT_WATER_COST_PER_LITER = 0.05
 DEFAULT_CLEANING_COST_INR = DEFAULT_WATER_USAGE_LITERS * DEFAULT_WATER_COST_PER_LITER
+# Shadow carbon price for sustainability-aligned operators (₹50-150 range for industrial ops)
+CARBON_PRICE_INR_PER_KG = 75.0
 
 
 # Scaling: 100 m² reference installation; 1 MW ~ 5000 m²
@@ -34,6 +47,91 @@ SCALED_1MW_PANEL_AREA_M2 = 5000.0   # ~1 MW solar farm
 PROJECTION_DAYS = 7                 # Trigger when projected 7-day recoverable > cost
 
 
+@njit(cache=True)
+def _first_profitable_window(daily_kwh, projection_days, electricity_price_inr, cleaning_cost_inr,
+                             carbon_factor, carbon_price_inr_per_kg, carbon_weight):
+    """
+    Index of the first day (from day 1) whose next `projection_days` days of
+    recoverable energy are worth more than a cleaning, or -1 if none is.
+    """
+    n = daily_kwh.shape[0]
+    for i in range(1, n - projection_days + 1):
+        projected_kwh = 0.0
+        for k in range(i, i + projection_days):
+            projected_kwh += daily_kwh[k]
+        
+        # Include weighted carbon value in threshold
+        energy_value = projected_kwh * electricity_price_inr
+        carbon_saved = projected_kwh * carbon_factor
+        carbon_value = carbon_saved * carbon_price_inr_per_kg * carbon_weight
+        if energy_value + carbon_value > cleaning_cost_inr:
+            return i
+    return -1
+
+
+def _first_profitable_window_numpy(daily_kwh, projection_days, electricity_price_inr, cleaning_cost_inr,
+                                   carbon_factor, carbon_price_inr_per_kg, carbon_weight):
+    """
+    Same result as _first_profitable_window, vectorized (used without Numba):
+    all window sums in one sweep, one threshold comparison, first True via argmax.
+    """
+    n = daily_kwh.shape[0]
+    if n < projection_days + 1:
+        return -1
+    # projected[j] = sum of daily_kwh[j+1 : j+1+projection_days] (windows start at day 1)
+    projected_kwh = np.lib.stride_tricks.sliding_window_view(daily_kwh[1:], projection_days).sum(axis=1)
+    
+    # Include weighted carbon value in threshold
+    energy_value = projected_kwh * electricity_price_inr
+    carbon_saved = projected_kwh * carbon_factor
+    carbon_value = carbon_saved * carbon_price_inr_per_kg * carbon_weight
+    profitable = energy_value + carbon_value > cleaning_cost_inr
+    if not profitable.any():
+        return -1
+    return int(profitable.argmax()) + 1
+
+
+def daily_recoverable_kwh(processed: pd.DataFrame) -> pd.Series:
+    """
+    Daily totals of recoverable energy from a processed (calculate_energy_metrics) frame.
+
+    A regular hourly grid of whole days starting at midnight is just a reshape to
+    (days, 24) and a row sum; anything else (gaps, partial days) goes through a
+    Polars group_by_dynamic when Polars is installed, else resample('D').
+    """
+    t = processed["datetime"].to_numpy()
+    if is_whole_day_hourly_grid(t):
+        recoverable = processed["recoverable_energy_kwh"].to_numpy()
+        return pd.Series(
+            recoverable.reshape(len(t) // 24, 24).sum(axis=1),
+            index=pd.DatetimeIndex(t[::24], name="datetime", freq="D"),
+            name="recoverable_energy_kwh",
+        )
+    if POLARS_AVAILABLE and t.dtype.kind == "M" and len(t) > 0:
+        daily = (
+            pl.from_pandas(processed[["datetime", "recoverable_energy_kwh"]])
+            .sort("datetime")
+            .group_by_dynamic("datetime", every="1d")
+            .agg(pl.col("recoverable_energy_kwh").sum())
+        )
+        recoverable = pd.Series(
+            daily["recoverable_energy_kwh"].to_numpy(),
+            index=pd.DatetimeIndex(daily["datetime"].to_numpy(), name="datetime"),
+            name="recoverable_energy_kwh",
+        )
+        # resample('D') also keeps days without rows (as 0), so the day positions line up
+        return recoverable.asfreq("D", fill_value=0.0)
+    return processed.resample("D", on="datetime")["recoverable_energy_kwh"].sum()
+
+
+def scenario_totals(processed: pd.DataFrame) -> dict:
+    """Total energy and total recoverable of a processed frame (run_scenario's result)."""
+    return {
+        "total_energy_kwh": float(processed["actual_energy_kwh"].sum()),
+        "total_recoverable_kwh": float(processed["recoverable_energy_kwh"].sum()),
+    }
+
+
 def get_recommended_cleaning_date(
     df: pd.DataFrame,
     electricity_price_inr: float = DEFAULT_ELECTRICITY_PRICE_INR,
@@ -41,50 +139,62 @@ def get_recommended_cleaning_date(
     projection_days: int = PROJECTION_DAYS,
     carbon_weight: float = 1.0,
     carbon_factor: float = DEFAULT_CARBON_FACTOR,
+    base_df: Optional[pd.DataFrame] = None,
+    daily_recoverable: Optional[pd.Series] = None,
 ) -> Optional[pd.Timestamp]:
     """
     Recommend cleaning on the first day when *projected* recoverable value
     (energy + weighted carbon) over the next `projection_days` days exceeds cleaning cost.
+
+    `base_df` is an optional calculate_base_metrics(df) result to reuse.
+    `daily_recoverable` is an optional precomputed daily no-cleaning recoverable series
+    (reference panel area, see daily_recoverable_kwh); when given, no physics is run.
     """
     if df.empty:
         return None
     
-    CARBON_PRICE_INR_PER_KG = 75.0
-    
-    processed = calculate_energy_metrics(df.copy(), cleaning_dates=[])
-    daily_recoverable = processed.resample("D", on="datetime")["recoverable_energy_kwh"].sum()
+    if daily_recoverable is None:
+        if base_df is None:
+            processed = calculate_energy_metrics(df, cleaning_dates=[])
+        else:
+            processed = apply_cleaning_schedule(base_df, cleaning_dates=[])
+        daily_recoverable = daily_recoverable_kwh(processed)
     if len(daily_recoverable) < projection_days + 1:
         return None
     # Start from day 1 so we don't recommend cleaning before meaningful dust buildup
-    for i in range(1, len(daily_recoverable) - projection_days + 1):
-        projected_kwh = daily_recoverable.iloc[i : i + projection_days].sum()
-        
-        # Include weighted carbon value in threshold
-        energy_value = projected_kwh * electricity_price_inr
-        carbon_saved = projected_kwh * carbon_factor
-        carbon_value = carbon_saved * CARBON_PRICE_INR_PER_KG * carbon_weight
-        total_value = energy_value + carbon_value
-        
-        if total_value > cleaning_cost_inr:
-            return daily_recoverable.index[i]
-    return None
+    # (the window scan runs compiled / vectorized over the daily totals; we only map the index back)
+    window_scan = _first_profitable_window if NUMBA_AVAILABLE else _first_profitable_window_numpy
+    i = window_scan(
+        daily_recoverable.to_numpy(dtype=np.float64),
+        int(projection_days),
+        float(electricity_price_inr),
+        float(cleaning_cost_inr),
+        float(carbon_factor),
+        CARBON_PRICE_INR_PER_KG,
+        float(carbon_weight),
+    )
+    if i < 0:
+        return None
+    return daily_recoverable.index[i]
 
 
 def run_scenario(
     df: pd.DataFrame,
     cleaning_dates: Optional[list] = None,
     panel_area: float = 100.0,
+    base_df: Optional[pd.DataFrame] = None,
 ) -> dict:
     """
     Run degradation model for one scenario and return total energy and total recoverable.
+
+    `base_df` is an optional calculate_base_metrics(df) result to reuse.
     """
     if cleaning_dates is None:
         cleaning_dates = []
-    processed = calculate_energy_metrics(df.copy(), panel_area=panel_area, cleaning_dates=cleaning_dates)
-    return {
-        "total_energy_kwh": float(processed["actual_energy_kwh"].sum()),
-        "total_recoverable_kwh": float(processed["recoverable_energy_kwh"].sum()),
-    }
+    if base_df is None:
+        base_df = calculate_base_metrics(df)
+    processed = apply_cleaning_schedule(base_df, cleaning_dates=cleaning_dates, panel_area=panel_area)
+    return scenario_totals(processed)
 
 
 def compute_comparison(
@@ -122,17 +232,19 @@ def compute_comparison(
     carbon_saved_kg = additional_kwh * carbon_factor
     value_gained_inr = additional_kwh * electricity_price_inr
     
-    # Carbon monetization with weight
-    # Using shadow carbon price for sustainability-aligned operators
+    # Carbon monetization with weight (shadow price, see CARBON_PRICE_INR_PER_KG)
     # Reflects true environmental cost including externalities
-    CARBON_PRICE_INR_PER_KG = 75.0  # Internal shadow pricing (₹50-150 range for industrial ops)
     carbon_value_inr = carbon_saved_kg * CARBON_PRICE_INR_PER_KG * carbon_weight
     
     # Net sustainability score includes weighted carbon value
     net_economic_gain_inr = value_gained_inr + carbon_value_inr - cleaning_cost_inr
     
-    print(f"[SCORE DEBUG] Energy value: ₹{value_gained_inr:.2f}, Carbon value (weighted): ₹{carbon_value_inr:.2f}, Cost: ₹{cleaning_cost_inr:.2f}")
-    print(f"[SCORE DEBUG] Net Sustainability Score: ₹{net_economic_gain_inr:.2f}")
+    # Lazy %-formatting: nothing is formatted unless DEBUG is enabled (this runs in sweeps)
+    logger.debug(
+        "[SCORE DEBUG] Energy value: ₹%.2f, Carbon value (weighted): ₹%.2f, Cost: ₹%.2f, "
+        "Net Sustainability Score: ₹%.2f",
+        value_gained_inr, carbon_value_inr, cleaning_cost_inr, net_economic_gain_inr,
+    )
 
     if water_used_liters > 0:
         water_efficiency_ratio = additional_kwh / water_used_liters
@@ -175,6 +287,44 @@ def compare_30day_scenarios(
     unless `cleaning_date_override` is provided (YYYY-MM-DD).
 
     Returns a structured dictionary with both scenario results and comparison metrics.
+    Single-plant case of compare_30day_scenarios_batch.
+    """
+    return compare_30day_scenarios_batch(
+        [plant_capacity_mw],
+        days=days,
+        latitude=latitude,
+        longitude=longitude,
+        panel_areas=None if panel_area is None else [panel_area],
+        electricity_price_inr=electricity_price_inr,
+        carbon_factor=carbon_factor,
+        cleaning_cost_inr=cleaning_cost_inr,
+        cleaning_date_override=cleaning_date_override,
+        carbon_weight=carbon_weight,
+    )[0]
+
+
+def compare_30day_scenarios_batch(
+    plant_capacities_mw,
+    days: int = 30,
+    latitude: float = 13.0827,
+    longitude: float = 80.2707,
+    panel_areas=None,  # Auto-calculated from plant_capacities_mw if not provided
+    electricity_price_inr: float = DEFAULT_ELECTRICITY_PRICE_INR,
+    carbon_factor: float = DEFAULT_CARBON_FACTOR,
+    cleaning_cost_inr: Optional[float] = None,
+    cleaning_date_override: Optional[str] = None,
+    carbon_weight: float = 1.0,  # Carbon importance (0-1)
+) -> list:
+    """
+    compare_30day_scenarios for several plant sizes at the same site, one result dict
+    per capacity (same content as the single calls).
+
+    Weather, the recommended date and both dust simulations don't depend on plant
+    size, so they are fetched / simulated once; each size only rescales the energy
+    columns (linear in panel area) and recomputes the totals.
+
+    Raises ValueError if `panel_areas` is given with a different length than
+    `plant_capacities_mw`.
     """
     if cleaning_cost_inr is None:
         cleaning_cost_inr = DEFAULT_CLEANING_COST_INR
@@ -182,94 +332,128 @@ def compare_30day_scenarios(
     # NEW: Calculate panel_area from MW capacity if not explicitly provided
     # 1 MW ≈ 5000 m² of solar panels
     MW_TO_M2 = 5000.0
-    if panel_area is None:
-        panel_area = plant_capacity_mw * MW_TO_M2
+    plant_capacities_mw = list(plant_capacities_mw)
+    if panel_areas is None:
+        panel_areas = [capacity * MW_TO_M2 for capacity in plant_capacities_mw]
+    else:
+        panel_areas = list(panel_areas)
+        if len(panel_areas) != len(plant_capacities_mw):
+            raise ValueError(
+                f"panel_areas has {len(panel_areas)} entries for {len(plant_capacities_mw)} plant capacities"
+            )
     
-    print(f"\n[ANALYSIS START] Plant: {plant_capacity_mw:.1f} MW ({panel_area:,.0f} m²)")
-    print(f"Location: lat={latitude:.4f}, lng={longitude:.4f}")
-    print(f"Carbon weight={carbon_weight:.2f}, Cleaning cost=₹{cleaning_cost_inr:.2f}\n")
-
     df = fetch_nasa_power_data(latitude=latitude, longitude=longitude, days=days)
     if df.empty:
-        return {
-            "error": "No data fetched",
-            "scenario_no_cleaning": None,
-            "scenario_with_cleaning": None,
-            "comparison": None,
-        }
+        return [
+            {
+                "error": "No data fetched",
+                "scenario_no_cleaning": None,
+                "scenario_with_cleaning": None,
+                "comparison": None,
+            }
+            for _ in plant_capacities_mw
+        ]
+    
+    # Weather-only losses are shared by the recommendation and both scenarios
+    base_df = calculate_base_metrics(df)
     
-    print(f"[DATA] Mean irradiance: {df['irradiance'].mean():.2f} W/m²")
+    # The no-cleaning simulation is shared too: the recommendation reads its recoverable
+    # energy at the reference area, and every plant size rescales it for Scenario 1
+    # (only the energy columns are rescaled, the dust simulation runs once)
+    no_clean_reference = apply_cleaning_schedule(base_df, cleaning_dates=[], panel_area=REFERENCE_PANEL_AREA_M2)
 
     # Recommended cleaning date
     if cleaning_date_override:
         cleaning_date = pd.to_datetime(cleaning_date_override)
     else:
         cleaning_date = get_recommended_cleaning_date(
-            df.copy(),
+            df,
             electricity_price_inr=electricity_price_inr,
             cleaning_cost_inr=cleaning_cost_inr,
             carbon_weight=carbon_weight,  # NEW: Pass through
             carbon_factor=carbon_factor,
+            daily_recoverable=daily_recoverable_kwh(no_clean_reference),
         )
-    
-    print(f"[RECOMMENDATION] Cleaning date: {cleaning_date.date() if cleaning_date else 'WAIT (no cleaning recommended)'}")
 
-    # Scenario 1: no cleaning
-    no_clean = run_scenario(df, cleaning_dates=[], panel_area=panel_area)
-    scenario_no_cleaning = {
-        "total_energy_kwh": round(no_clean["total_energy_kwh"], 2),
-        "total_recoverable_kwh": round(no_clean["total_recoverable_kwh"], 2),
-    }
-
-    # Scenario 2: cleaning at recommended date (or no cleaning if none recommended)
+    # Scenario 2 dust simulation, also shared by every plant size
     if cleaning_date is not None:
-        with_clean = run_scenario(df, cleaning_dates=[cleaning_date], panel_area=panel_area)
-        scenario_with_cleaning = {
-            "cleaning_date": str(cleaning_date.date()),
-            "total_energy_kwh": round(with_clean["total_energy_kwh"], 2),
-            "total_recoverable_kwh": round(with_clean["total_recoverable_kwh"], 2),
-        }
-        comparison = compute_comparison(
-            no_clean,
-            with_clean,
-            cleaning_cost_inr=cleaning_cost_inr,
-            carbon_factor=carbon_factor,
-            electricity_price_inr=electricity_price_inr,
-            water_used_liters=DEFAULT_WATER_USAGE_LITERS,
-            panel_area_m2=panel_area,
-            carbon_weight=carbon_weight,  # NEW: Pass through
+        with_clean_reference = apply_cleaning_schedule(
+            base_df, cleaning_dates=[cleaning_date], panel_area=REFERENCE_PANEL_AREA_M2
         )
+
+    # Period bounds straight from the datetime64 array (no Timestamp boxing)
+    timestamps = df["datetime"].to_numpy()
+    if timestamps.dtype.kind == "M":
+        period_start_iso, period_end_iso = np.datetime_as_string(timestamps[[0, -1]], unit="s")
     else:
-        scenario_with_cleaning = {
-            "cleaning_date": None,
-            "total_energy_kwh": scenario_no_cleaning["total_energy_kwh"],
-            "total_recoverable_kwh": scenario_no_cleaning["total_recoverable_kwh"],
-        }
-        comparison = {
-            "additional_energy_gained_kwh": 0.0,
-            "total_output_gain_percent": 0.0,
-            "recoverable_capture_percent": 0.0,
-            "carbon_saved_kg": 0.0,
-            "net_economic_gain_inr": 0.0,
-            "water_used_liters": DEFAULT_WATER_USAGE_LITERS,
-            "water_efficiency_ratio_kwh_per_liter": 0.0,
-            "scaled_net_gain_1mw_inr": 0.0,
-            "scaling_note": f"Reference {panel_area:.0f} m²; 1 MW (~{SCALED_1MW_PANEL_AREA_M2:.0f} m²) scale.",
+        period_start, period_end = timestamps[0], timestamps[-1]
+        period_start_iso = period_start.isoformat() if hasattr(period_start, "isoformat") else str(period_start)
+        period_end_iso = period_end.isoformat() if hasattr(period_end, "isoformat") else str(period_end)
+
+    results = []
+    for plant_capacity_mw, panel_area in zip(plant_capacities_mw, panel_areas):
+        # Scenario 1: no cleaning
+        no_clean = scenario_totals(rescale_panel_area(no_clean_reference, panel_area))
+        scenario_no_cleaning = {
+            "total_energy_kwh": round(no_clean["total_energy_kwh"], 2),
+            "total_recoverable_kwh": round(no_clean["total_recoverable_kwh"], 2),
         }
 
-    period_start = df["datetime"].iloc[0]
-    period_end = df["datetime"].iloc[-1]
-    
-    print(f"[ANALYSIS END]\n")
-
-    return {
-        "scenario_no_cleaning": scenario_no_cleaning,
-        "scenario_with_cleaning": scenario_with_cleaning,
-        "comparison": comparison,
-        "period_days": days,
-        "period_start_iso": period_start.isoformat() if hasattr(period_start, "isoformat") else str(period_start),
-        "period_end_iso": period_end.isoformat() if hasattr(period_end, "isoformat") else str(period_end),
-    }
+        # Scenario 2: cleaning at recommended date (or no cleaning if none recommended)
+        if cleaning_date is not None:
+            with_clean = scenario_totals(rescale_panel_area(with_clean_reference, panel_area))
+            scenario_with_cleaning = {
+                "cleaning_date": str(cleaning_date.date()),
+                "total_energy_kwh": round(with_clean["total_energy_kwh"], 2),
+                "total_recoverable_kwh": round(with_clean["total_recoverable_kwh"], 2),
+            }
+            comparison = compute_comparison(
+                no_clean,
+                with_clean,
+                cleaning_cost_inr=cleaning_cost_inr,
+                carbon_factor=carbon_factor,
+                electricity_price_inr=electricity_price_inr,
+                water_used_liters=DEFAULT_WATER_USAGE_LITERS,
+                panel_area_m2=panel_area,
+                carbon_weight=carbon_weight,  # NEW: Pass through
+            )
+        else:
+            scenario_with_cleaning = {
+                "cleaning_date": None,
+                "total_energy_kwh": scenario_no_cleaning["total_energy_kwh"],
+                "total_recoverable_kwh": scenario_no_cleaning["total_recoverable_kwh"],
+            }
+            comparison = {
+                "additional_energy_gained_kwh": 0.0,
+                "total_output_gain_percent": 0.0,
+                "recoverable_capture_percent": 0.0,
+                "carbon_saved_kg": 0.0,
+                "net_economic_gain_inr": 0.0,
+                "water_used_liters": DEFAULT_WATER_USAGE_LITERS,
+                "water_efficiency_ratio_kwh_per_liter": 0.0,
+                "scaled_net_gain_1mw_inr": 0.0,
+                "scaling_note": f"Reference {panel_area:.0f} m²; 1 MW (~{SCALED_1MW_PANEL_AREA_M2:.0f} m²) scale.",
+            }
+
+        # One record per analysis; the mean is only computed when DEBUG is on
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "[ANALYSIS] Plant: %.1f MW (%.0f m²), lat=%.4f, lng=%.4f, carbon weight=%.2f, "
+                "cleaning cost=₹%.2f, mean irradiance=%.2f W/m², recommended cleaning: %s",
+                plant_capacity_mw, panel_area, latitude, longitude, carbon_weight,
+                cleaning_cost_inr, df["irradiance"].mean(),
+                cleaning_date.date() if cleaning_date is not None else "WAIT (no cleaning recommended)",
+            )
+
+        results.append({
+            "scenario_no_cleaning": scenario_no_cleaning,
+            "scenario_with_cleaning": scenario_with_cleaning,
+            "comparison": comparison,
+            "period_days": days,
+            "period_start_iso": str(period_start_iso),
+            "period_end_iso": str(period_end_iso),
+        })
+    return results
 
 
 if __name__ == "__main__":
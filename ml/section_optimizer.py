@@ -7,34 +7,110 @@ Optimizes cleaning schedule by prioritizing sections with highest ROI.
 
 import pandas as pd
 import numpy as np
-from typing import List, Tuple
+from typing import List, Optional, Tuple, Union
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from degradation_model import calculate_energy_metrics
+from numba_compat import njit, NUMBA_AVAILABLE
+
+
+class FarmGrid:
+    """
+    All sections of a farm grid as parallel numpy arrays (SoA), one entry per section.
+    
+    Ranking, ROI and the water-budget pass work on whole arrays; indexing / iterating
+    yields FarmSection views for per-section access and to_dict().
+    """
+    
+    RESULT_FIELDS = ('energy_loss_kwh', 'energy_loss_percent', 'cleaning_cost',
+                     'cleaning_priority', 'roi_score')
+    
+    def __init__(self, section_ids, rows, cols, panel_area, orientation, shading, dust_multiplier):
+        self.ids = list(section_ids)
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.cols = np.asarray(cols, dtype=np.int64)
+        self.panel_area = np.asarray(panel_area, dtype=np.float64)
+        self.orientation = np.asarray(orientation, dtype=np.float64)  # 0-360°, 180 = south
+        self.shading = np.asarray(shading, dtype=np.float64)  # 0.0-1.0, 1.0 = no shading
+        self.dust_multiplier = np.asarray(dust_multiplier, dtype=np.float64)  # 0.8-1.5
+        
+        # Results (calculated later)
+        for field in self.RESULT_FIELDS:
+            setattr(self, field, np.zeros(len(self.ids)))
+    
+    @classmethod
+    def from_sections(cls, sections):
+        """Copies a list of FarmSections (results included) into one grid."""
+        grid = cls([s.id for s in sections], [s.row for s in sections], [s.col for s in sections],
+                   [s.panel_area for s in sections], [s.orientation for s in sections],
+                   [s.shading for s in sections], [s.dust_multiplier for s in sections])
+        for field in cls.RESULT_FIELDS:
+            getattr(grid, field)[:] = [getattr(s, field) for s in sections]
+        return grid
+    
+    def __len__(self):
+        return len(self.ids)
+    
+    def __getitem__(self, i):
+        # Same indexing as the list of sections this replaced: ints (negative too) give
+        # one view, slices a list of views, out-of-range ints raise IndexError
+        try:
+            index = range(len(self.ids))[i]
+        except IndexError:
+            raise IndexError("FarmGrid index out of range") from None
+        if isinstance(index, range):
+            return [FarmSection._view(self, j) for j in index]
+        return FarmSection._view(self, index)
+    
+    def __iter__(self):
+        return (FarmSection._view(self, i) for i in range(len(self.ids)))
+
+
+def _grid_field(name, cast=float):
+    """FarmSection attribute backed by element `_i` of FarmGrid array `name`."""
+    def getter(self):
+        return cast(getattr(self._grid, name)[self._i])
+    def setter(self, value):
+        getattr(self._grid, name)[self._i] = value
+    return property(getter, setter)
 
 
 class FarmSection:
-    """Represents one section of a farm grid"""
+    """Represents one section of a farm grid (a view onto one entry of a FarmGrid)"""
     
     def __init__(self, section_id: str, row: int, col: int, 
                  panel_area_m2: float, orientation_deg: float = 180,
                  shading_factor: float = 1.0, dust_multiplier: float = 1.0):
-        self.id = section_id
-        self.row = row
-        self.col = col
-        self.panel_area = panel_area_m2
-        self.orientation = orientation_deg  # 0-360°, 180 = south
-        self.shading = shading_factor  # 0.0-1.0, 1.0 = no shading
-        self.dust_multiplier = dust_multiplier  # 0.8-1.5
-        
-        # Results (calculated later)
-        self.energy_loss_kwh = 0.0
-        self.energy_loss_percent = 0.0
-        self.cleaning_cost = 0.0
-        self.cleaning_priority = 0.0
-        self.roi_score = 0.0
+        # A standalone section is backed by its own one-entry grid
+        self._grid = FarmGrid([section_id], [row], [col], [panel_area_m2],
+                              [orientation_deg], [shading_factor], [dust_multiplier])
+        self._i = 0
+    
+    @classmethod
+    def _view(cls, grid: FarmGrid, i: int):
+        section = cls.__new__(cls)
+        section._grid = grid
+        section._i = i
+        return section
+    
+    @property
+    def id(self):
+        return self._grid.ids[self._i]
+    
+    row = _grid_field('rows', int)
+    col = _grid_field('cols', int)
+    panel_area = _grid_field('panel_area')
+    orientation = _grid_field('orientation')
+    shading = _grid_field('shading')
+    dust_multiplier = _grid_field('dust_multiplier')
+    
+    energy_loss_kwh = _grid_field('energy_loss_kwh')
+    energy_loss_percent = _grid_field('energy_loss_percent')
+    cleaning_cost = _grid_field('cleaning_cost')
+    cleaning_priority = _grid_field('cleaning_priority')
+    roi_score = _grid_field('roi_score')
         
     def to_dict(self):
         return {
@@ -53,7 +129,8 @@ class FarmSection:
         }
 
 
-def generate_farm_grid(farm_size_mw: float, grid_rows: int, grid_cols: int) -> List[FarmSection]:
+def generate_farm_grid(farm_size_mw: float, grid_rows: int, grid_cols: int,
+                       seed: Optional[int] = None) -> FarmGrid:
     """
     Generate N×M grid of farm sections with realistic variations
     
@@ -61,47 +138,59 @@ def generate_farm_grid(farm_size_mw: float, grid_rows: int, grid_cols: int) -> L
         farm_size_mw: Farm capacity in MW
         grid_rows: Number of rows in grid
         grid_cols: Number of columns in grid
+        seed: Optional seed for reproducible grids
         
     Returns:
-        List of FarmSection objects
+        FarmGrid (row-major; indexing/iterating gives FarmSection views)
     """
     total_area = farm_size_mw * 5000  # MW to m²
     section_area = total_area / (grid_rows * grid_cols)
+    shape = (grid_rows, grid_cols)
     
-    sections = []
-    for row in range(grid_rows):
-        for col in range(grid_cols):
-            # Realistic variations
-            # Edge sections have more shading from structures
-            edge_penalty = 0.05 if (row == 0 or row == grid_rows-1 or 
-                                    col == 0 or col == grid_cols-1) else 0
-            shading = 1.0 - edge_penalty - np.random.uniform(0, 0.03)
-            
-            # Dust accumulation varies by position (wind patterns)
-            # Prevailing wind from west → eastern sections accumulate less
-            dust_base = 1.0
-            dust_variation = (col / grid_cols) * 0.3  # 0-30% variation
-            dust_multiplier = dust_base + np.random.uniform(-0.1, 0.1) - dust_variation * 0.5
-            
-            # Orientation varies slightly
-            orientation = 180 + np.random.uniform(-5, 5)
-            
-            section = FarmSection(
-                section_id=f"S{row}{col}",
-                row=row,
-                col=col,
-                panel_area_m2=section_area,
-                orientation_deg=orientation,
-                shading_factor=max(0.7, shading),  # Min 70% efficiency
-                dust_multiplier=np.clip(dust_multiplier, 0.8, 1.5)
-            )
-            sections.append(section)
+    # All random fields drawn in bulk, one call per field
+    rng = np.random.default_rng(seed)
     
-    return sections
+    # Realistic variations
+    # Edge sections have more shading from structures
+    edge_penalty = np.zeros(shape)
+    edge_penalty[0, :] = edge_penalty[-1, :] = 0.05
+    edge_penalty[:, 0] = edge_penalty[:, -1] = 0.05
+    shading = 1.0 - edge_penalty - rng.uniform(0, 0.03, shape)
+    shading = np.maximum(0.7, shading)  # Min 70% efficiency
+    
+    # Dust accumulation varies by position (wind patterns)
+    # Prevailing wind from west → eastern sections accumulate less
+    dust_base = 1.0
+    dust_variation = (np.arange(grid_cols) / grid_cols) * 0.3  # 0-30% variation, per column
+    dust_multiplier = dust_base + rng.uniform(-0.1, 0.1, shape) - dust_variation * 0.5
+    dust_multiplier = np.clip(dust_multiplier, 0.8, 1.5)
+    
+    # Orientation varies slightly
+    orientation = 180 + rng.uniform(-5, 5, shape)
+    
+    rows, cols = np.divmod(np.arange(grid_rows * grid_cols), grid_cols)
+    section_ids = [f"S{row}{col}" for row, col in zip(rows.tolist(), cols.tolist())]
+    
+    return FarmGrid(section_ids, rows, cols, np.full(rows.size, section_area),
+                    orientation.ravel(), shading.ravel(), dust_multiplier.ravel())
+
+
+def unit_area_energy_totals(df: pd.DataFrame) -> Tuple[float, float]:
+    """
+    (recoverable, potential) kWh per m² of panel over `df`, with no cleaning.
+    
+    Energy is linear in panel area (irradiance × area × efficiency), so these two
+    sums are all the physics a section needs. Compute them once per weather frame
+    and pass them as `unit_totals` when analyzing sections in several calls.
+    """
+    processed = calculate_energy_metrics(df, panel_area=1.0, cleaning_dates=[])
+    # Base recoverable / potential (ideal, clean-panel) energy per m²
+    return processed['recoverable_energy_kwh'].sum(), processed['ideal_energy_kwh'].sum()
 
 
 def calculate_section_energy_loss(section: FarmSection, df: pd.DataFrame,
-                                   electricity_price: float = 6.0) -> FarmSection:
+                                   electricity_price: float = 6.0,
+                                   unit_totals: Optional[Tuple[float, float]] = None) -> FarmSection:
     """
     Calculate energy loss for a specific section
     
@@ -109,38 +198,117 @@ def calculate_section_energy_loss(section: FarmSection, df: pd.DataFrame,
         section: FarmSection to analyze
         df: Weather data DataFrame
         electricity_price: Price per kWh in INR
+        unit_totals: Optional precomputed unit_area_energy_totals(df)
+    """
+    calculate_sections_energy_loss([section], df, electricity_price, unit_totals)
+    return section
+
+
+def calculate_sections_energy_loss(sections: Union[FarmGrid, List[FarmSection]], df: pd.DataFrame,
+                                   electricity_price: float = 6.0,
+                                   unit_totals: Optional[Tuple[float, float]] = None
+                                   ) -> Union[FarmGrid, List[FarmSection]]:
+    """
+    Batch version of calculate_section_energy_loss for a whole grid.
+    
+    All sections share the same weather, and energy scales linearly with panel area,
+    so the physics model runs ONCE for 1 m² and every section is a vector multiply.
+    
+    Args:
+        sections: FarmGrid or list of FarmSections to analyze (results are written back)
+        df: Weather data DataFrame
+        electricity_price: Price per kWh in INR
+        unit_totals: Optional precomputed unit_area_energy_totals(df), skips the physics run
     """
-    # Run degradation model for this section's panel area
-    processed = calculate_energy_metrics(df.copy(), panel_area=section.panel_area, cleaning_dates=[])
+    if len(sections) == 0:
+        return sections
+    grid = sections if isinstance(sections, FarmGrid) else FarmGrid.from_sections(sections)
+    
+    # Run degradation model once, per m² of panel (or reuse the caller's run)
+    if unit_totals is None:
+        unit_totals = unit_area_energy_totals(df)
+    base_recoverable_per_m2, potential_per_m2 = unit_totals
     
-    # Base recoverable energy
-    base_recoverable = processed['recoverable_energy_kwh'].sum()
+    # Section attributes as arrays (SoA)
+    areas = grid.panel_area
+    dust = grid.dust_multiplier
+    shade = grid.shading
     
     # Apply section-specific modifiers
-    section.energy_loss_kwh = base_recoverable * section.dust_multiplier * section.shading
+    energy_loss = base_recoverable_per_m2 * areas * dust * shade
     
-    # Calculate as percentage of potential
-    potential_energy = processed['potential_energy_kwh'].sum()
-    if potential_energy > 0:
-        section.energy_loss_percent = (section.energy_loss_kwh / potential_energy) * 100
+    # Calculate as percentage of potential (left at 0 when there's no potential)
+    potential_energy = potential_per_m2 * areas
+    loss_percent = np.zeros_like(energy_loss)
+    np.divide(energy_loss * 100, potential_energy, out=loss_percent, where=potential_energy > 0)
     
     # Calculate cleaning cost (₹25 per 1000 m²)
-    section.cleaning_cost = (section.panel_area / 1000) * 25
+    cleaning_cost = (areas / 1000) * 25
     
-    # Calculate ROI
-    energy_value = section.energy_loss_kwh * electricity_price
-    if section.cleaning_cost > 0:
-        section.roi_score = energy_value / section.cleaning_cost
-    else:
-        section.roi_score = 0
+    # Calculate ROI (0 for free cleanings)
+    energy_value = energy_loss * electricity_price
+    roi = np.zeros_like(energy_value)
+    np.divide(energy_value, cleaning_cost, out=roi, where=cleaning_cost > 0)
     
+    grid.energy_loss_kwh[:] = energy_loss
+    grid.energy_loss_percent[:] = loss_percent
+    grid.cleaning_cost[:] = cleaning_cost
+    grid.roi_score[:] = roi
     # Priority = ROI score (higher = clean first)
-    section.cleaning_priority = section.roi_score
+    grid.cleaning_priority[:] = roi
     
-    return section
+    if grid is not sections:
+        # Plain list of sections: copy the results back onto each one
+        for i, section in enumerate(sections):
+            for field in FarmGrid.RESULT_FIELDS:
+                setattr(section, field, getattr(grid, field)[i])
+    
+    return sections
+
+
+@njit(cache=True)
+def _skip_greedy_tail(water_need, start, water_used, water_budget_liters):
+    """
+    Sequential skip-if-over-budget pass over water_need[start:] (priority order).
+    Returns (taken mask over all positions, water used).
+    """
+    taken = np.zeros(water_need.shape[0], dtype=np.bool_)
+    for k in range(start, water_need.shape[0]):
+        if water_used + water_need[k] <= water_budget_liters:
+            taken[k] = True
+            water_used += water_need[k]
+    return taken, water_used
 
 
-def optimize_section_cleaning(sections: List[FarmSection], 
+def _greedy_select(order: np.ndarray, water_need: np.ndarray,
+                   water_budget_liters: float) -> Tuple[List[int], float]:
+    """
+    Greedy water-budget pass over sections in `order` (water_need aligned with it).
+    Returns (selected grid indices, water used).
+    """
+    # Everything up to the first section that overflows the budget is taken as-is:
+    # one cumsum (sequential, so the same running total as the loop) and a binary search
+    cumulative_need = np.cumsum(water_need)
+    n_prefix = int(np.searchsorted(cumulative_need, water_budget_liters, side='right'))
+    selected_idx = order[:n_prefix].tolist()
+    water_used = float(cumulative_need[n_prefix - 1]) if n_prefix else 0.0
+    
+    # Past that point a section that doesn't fit is skipped and smaller ones after it
+    # may still fit, so the tail stays a sequential pass (compiled, or over plain floats)
+    if NUMBA_AVAILABLE:
+        taken, water_used = _skip_greedy_tail(water_need, n_prefix + 1, water_used,
+                                              float(water_budget_liters))
+        selected_idx.extend(order[taken].tolist())
+    else:
+        for i, section_water_need in zip(order[n_prefix + 1:].tolist(), water_need[n_prefix + 1:].tolist()):
+            if water_used + section_water_need <= water_budget_liters:
+                selected_idx.append(i)
+                water_used += section_water_need
+            # Stop when budget exhausted
+    return selected_idx, water_used
+
+
+def optimize_section_cleaning(sections: Union[FarmGrid, List[FarmSection]], 
                               water_budget_liters: float) -> Tuple[List[FarmSection], float]:
     """
     Select which sections to clean based on water budget
@@ -150,21 +318,37 @@ def optimize_section_cleaning(sections: List[FarmSection],
     Returns:
         (selected_sections, water_used)
     """
-    # Sort by cleaning priority (ROI) descending
-    sorted_sections = sorted(sections, key=lambda s: s.cleaning_priority, reverse=True)
+    grid = sections if isinstance(sections, FarmGrid) else FarmGrid.from_sections(sections)
+    n_sections = len(grid)
+    neg_priority = -grid.cleaning_priority
     
-    selected = []
-    water_used = 0.0
+    # Water needed: 500L per 100m²
+    water_need = (grid.panel_area / 100) * 500
     
-    for section in sorted_sections:
-        # Water needed: 500L per 100m²
-        section_water_need = (section.panel_area / 100) * 500
+    # Fast path for small budgets: only rank the ~top-K sections that can fit
+    # (K estimated from the average need), not the whole grid
+    mean_need = float(water_need.mean()) if n_sections else 0.0
+    k_est = max(10, int(1.2 * water_budget_liters / mean_need)) if mean_need > 0 else n_sections
+    if k_est < n_sections:
+        # All sections at least as high as the K-th priority (ties included), so the
+        # candidates are exactly a prefix of the full stable ranking
+        kth = np.partition(neg_priority, k_est - 1)[k_est - 1]
+        candidates = np.flatnonzero(neg_priority <= kth)
+        order = candidates[np.argsort(neg_priority[candidates], kind='stable')]
+        selected_idx, water_used = _greedy_select(order, water_need[order], water_budget_liters)
         
-        if water_used + section_water_need <= water_budget_liters:
-            selected.append(section)
-            water_used += section_water_need
-        # Stop when budget exhausted
+        # Water used only grows, so if not even the smallest remaining section fits now,
+        # nothing further down the ranking would be picked
+        rest = np.ones(n_sections, dtype=bool)
+        rest[candidates] = False
+        if not (rest.any() and water_used + water_need[rest].min() <= water_budget_liters):
+            return [sections[i] for i in selected_idx], water_used
+    
+    # Sort by cleaning priority (ROI) descending; stable, so ties keep grid order
+    order = np.argsort(neg_priority, kind='stable')
+    selected_idx, water_used = _greedy_select(order, water_need[order], water_budget_liters)
     
+    selected = [sections[i] for i in selected_idx]
     return selected, water_used
 
 
@@ -183,14 +367,13 @@ if __name__ == "__main__":
     
     # Analyze each section
     print("Analyzing sections...")
-    for section in sections:
-        calculate_section_energy_loss(section, df)
+    calculate_sections_energy_loss(sections, df)
     
     # Sort by priority
-    sections.sort(key=lambda s: s.cleaning_priority, reverse=True)
+    ranked = [sections[i] for i in np.argsort(-sections.cleaning_priority, kind='stable')]
     
     print("\nTop 5 Sections by ROI:")
-    for i, section in enumerate(sections[:5], 1):
+    for i, section in enumerate(ranked[:5], 1):
         print(f"{i}. {section.id}: {section.energy_loss_kwh:.0f} kWh loss, "
               f"ROI: {section.roi_score:.2f}, Priority: {section.cleaning_priority:.2f}")
     
@@ -1,6 +1,6 @@
 import numpy as np
 import pandas as pd
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Tuple
 
 class UncertaintyEngine:
     """
@@ -15,59 +15,71 @@ class UncertaintyEngine:
     3. Cleaning Efficacy (Not always 100% perfect)
     """
     
-    def __init__(self, simulations: int = 50):
+    def __init__(self, simulations: int = 50, seed: Optional[int] = None):
         self.simulations = simulations
+        # Own PCG64 generator (seedable per engine) instead of the global np.random state
+        self._rng = np.random.default_rng(seed)
         
-    def run_monte_carlo(self, base_df: pd.DataFrame, degradation_model_func) -> Dict:
+    def run_monte_carlo(self, base_df: pd.DataFrame, degradation_model_func, batch_model_func=None) -> Dict:
         """
         Runs multiple simulations with perturbed inputs.
         
         Args:
             base_df: The deterministic weather/physics data.
             degradation_model_func: Function to recalculate energy (dependency injection).
+            batch_model_func: Optional batched version, called once as
+                f(base_df, irradiance, temperature) with (S, T) arrays and returning
+                the (S,) total energies (e.g. degradation_model.simulate_total_energy).
+                Skips the per-simulation DataFrame pipeline entirely.
             
         Returns:
             Dict containing P10, P50, P90 stats for Energy and Revenue.
         """
-        energy_results = []
-        
         # We treat 'base_df' as the P50 (median) forecast.
         # Now we perturb it.
+        n_rows = len(base_df)
         
-        for _ in range(self.simulations):
-            sim_df = base_df.copy()
-            
-            # --- PERTURBATION LOGIC ---
-            
-            # 1. Weather Uncertainty (Nasa Power accuracy is ~10-15%)
-            # Multiplicative noise centered at 1.0, sigma 0.1
-            irr_noise = np.random.normal(1.0, 0.10, size=len(sim_df))
-            sim_df['irradiance'] *= irr_noise
-            
-            # Additive noise for temperature (sigma 1.5C)
-            temp_noise = np.random.normal(0, 1.5, size=len(sim_df))
-            sim_df['temperature'] += temp_noise
-            
-            # 2. Physics Parameter Uncertainty
-            # Dust rate might be higher/lower than 0.15/month
-            # We don't have easy access to internal model constants here without modifying the func signature.
-            # So we will rely on output variance primarily from weather for now, 
-            # OR we can manually apply a noise factor to the *output* efficiency if needed.
-            
-            # Run Model
-            # Recalculate energy with noisy weather
-            # Note: We assume degradation_model_func handles the full pipeline
-            result_df = degradation_model_func(sim_df)
-            
-            total_energy = result_df['actual_energy_kwh'].sum()
-            energy_results.append(total_energy)
+        # --- PERTURBATION LOGIC ---
+        
+        # 1. Weather Uncertainty (Nasa Power accuracy is ~10-15%)
+        # Irradiance: multiplicative noise centered at 1.0, sigma 0.1
+        # Temperature: additive noise, sigma 1.5C
+        # Drawn up-front as (S, T) matrices, row s belongs to simulation s
+        irr_noise = self._rng.normal(1.0, 0.10, size=(self.simulations, n_rows))
+        temp_noise = self._rng.normal(0.0, 1.5, size=(self.simulations, n_rows))
+        irradiance = base_df['irradiance'].to_numpy() * irr_noise
+        temperature = base_df['temperature'].to_numpy() + temp_noise
+        
+        # 2. Physics Parameter Uncertainty
+        # Dust rate might be higher/lower than 0.15/month
+        # We don't have easy access to internal model constants here without modifying the func signature.
+        # So we will rely on output variance primarily from weather for now, 
+        # OR we can manually apply a noise factor to the *output* efficiency if needed.
+        
+        if batch_model_func is not None:
+            energy_results = np.asarray(batch_model_func(base_df, irradiance, temperature), dtype=np.float64)
+        else:
+            # Preallocated tally, one slot per simulation
+            energy_results = np.empty(self.simulations, dtype=np.float64)
+            # One shallow copy for the whole run: each simulation swaps in its own
+            # (contiguous) weather rows, base_df's arrays are never written to
+            sim_df = base_df.copy(deep=False)
+            for s in range(self.simulations):
+                sim_df['irradiance'] = irradiance[s]
+                sim_df['temperature'] = temperature[s]
+                
+                # Run Model
+                # Recalculate energy with noisy weather
+                # Note: We assume degradation_model_func handles the full pipeline
+                result_df = degradation_model_func(sim_df)
+                energy_results[s] = result_df['actual_energy_kwh'].sum()
             
         # --- STATISTICS ---
-        energy_results = np.array(energy_results)
-        
-        p10 = np.percentile(energy_results, 10) # 90% chance to exceed this (Conservative)
-        p50 = np.percentile(energy_results, 50) # Median
-        p90 = np.percentile(energy_results, 90) # 10% chance to exceed this (Optimistic)
+        # One call: the sorted results are shared by all three quantiles
+        # P10: 90% chance to exceed this (Conservative)
+        # P50: Median
+        # P90: 10% chance to exceed this (Optimistic)
+        p10, p50, p90 = np.percentile(energy_results, [10, 50, 90], method='linear')
         
         # Calculate Risk-Adjusted Revenue (using conservative P10 estimate)
         # This is what banks/financiers care about ("Bankable Yield")
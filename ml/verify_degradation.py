@@ -25,14 +25,14 @@ def verify():
     
     # Check 2: Efficiency Decay due to Dust
     # At start (Day 0), dust should be near 0.
-    eff_start = df_processed['effective_efficiency'].iloc[0]
-    dust_start = df_processed['dust_loss'].iloc[0]
+    eff_start = df_processed['effective_efficiency'].iat[0]
+    dust_start = df_processed['dust_loss'].iat[0]
     print(f"Efficiency Start: {eff_start:.4f} (Expected ~0.20)")
     print(f"Dust Loss Start: {dust_start:.4f} (Expected ~0.00)")
     
     # At end (Day 30), dust_level ~0.15; multiplicative: eff = 0.20 * (1 - 0.15) ≈ 0.17
-    eff_end = df_processed['effective_efficiency'].iloc[-1]
-    dust_end = df_processed['dust_loss'].iloc[-1]
+    eff_end = df_processed['effective_efficiency'].iat[-1]
+    dust_end = df_processed['dust_loss'].iat[-1]
     print(f"Efficiency End: {eff_end:.4f} (Expected ~0.17, multiplicative)")
     print(f"Dust Loss End: {dust_end:.4f} (Expected ~0.15)")
     
@@ -49,8 +49,8 @@ def verify():
     # Check 3: Recoverable Energy
     # Ideal = 1000 * 100 * 0.20 / 1000 = 20 kWh/h. Multiplicative: actual drops from 20 to ~17 kWh/h.
     # Recoverable should increase.
-    rec_start = df_processed['recoverable_energy_kwh'].iloc[0]
-    rec_end = df_processed['recoverable_energy_kwh'].iloc[-1]
+    rec_start = df_processed['recoverable_energy_kwh'].iat[0]
+    rec_end = df_processed['recoverable_energy_kwh'].iat[-1]
     
     print(f"Recoverable Start: {rec_start:.4f}")
     print(f"Recoverable End: {rec_end:.4f}")
@@ -34,7 +34,7 @@ def verify_accuracy():
     # So expected is 0.20 * (1-0.01) = 0.198 (19.8%)
     
     res1 = calculate_energy_metrics(df1)
-    actual1 = res1['effective_efficiency'].iloc[0]
+    actual1 = res1['effective_efficiency'].iat[0]
     expected1 = 0.20 * (1 - 0.01) # 1% default mismatch
     
     status1 = "PASS" if abs(actual1 - expected1) < 0.0001 else "FAIL"
@@ -67,18 +67,17 @@ def verify_accuracy():
     # But we can inspect the output columns to ensure the final math holds up.
     
     res2 = calculate_energy_metrics(df2)
-    row = res2.iloc[0]
-    
-    base = row['base_efficiency']      # 0.20
-    dust = row['dust_level']           # ~0 (first hour)
-    temp = row['temperature_loss']     # Should be 0.04
-    age = row['aging_loss']            # ~0
-    shade = row['shading_loss']        # 12:00 -> 0
-    mis = row['mismatch_loss']         # 1%
+    # Scalar readouts straight from the columns (no mixed-dtype row Series is built)
+    base = res2['base_efficiency'].iat[0]      # 0.20
+    dust = res2['dust_level'].iat[0]           # ~0 (first hour)
+    temp = res2['temperature_loss'].iat[0]     # Should be 0.04
+    age = res2['aging_loss'].iat[0]            # ~0
+    shade = res2['shading_loss'].iat[0]        # 12:00 -> 0
+    mis = res2['mismatch_loss'].iat[0]         # 1%
     
     # Manual Calc
     manual_eff = base * (1-dust) * (1-temp) * (1-age) * (1-shade) * (1-mis)
-    model_eff = row['effective_efficiency']
+    model_eff = res2['effective_efficiency'].iat[0]
     
     print(f"\nInputs Detected by Model:")
     print(f"  Base Eff: {base:.4f}")
@@ -111,7 +110,7 @@ def verify_accuracy():
         'precipitation': [0]
     })
     res3 = calculate_energy_metrics(df3)
-    mis_actual = res3['mismatch_loss'].iloc[0]
+    mis_actual = res3['mismatch_loss'].iat[0]
     mis_expected = 0.035
     
     print(f"Irradiance 100 W/m2:")
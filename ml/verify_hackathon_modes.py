@@ -7,20 +7,15 @@ import numpy as np
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from multi_farm_optimizer import SolarFarm, MultiSiteOptimizer
+from mock_data import get_mock_weather
 
 def run_hackathon_verification():
     print("==========================================")
     print("   HACKATHON FEATURE VERIFICATION         ")
     print("==========================================")
     
-    # Mock Data
-    dates = pd.date_range(start='2025-01-01', periods=72, freq='h')
-    df_mock = pd.DataFrame({
-        'datetime': dates,
-        'irradiance': np.random.uniform(0, 1000, 72),
-        'temperature': np.random.uniform(25, 35, 72),
-        'precipitation': np.zeros(72)
-    })
+    # Mock Data (seeded, shared recipe with the other verify scripts)
+    df_mock = get_mock_weather(periods=72)
     
     # Define Heterogeneous Farms
     # A: High Benefit, High Water (Big Farm)
@@ -65,14 +60,14 @@ def run_hackathon_verification():
     print("\n>>> TESTING VISUALIZATION TRIGGER")
     # Need data that triggers cleaning (High irradiance, long period)
     dates_long = pd.date_range(start='2025-01-01', periods=720, freq='h') # 30 days
+    hour = dates_long.hour.to_numpy()
     df_vis = pd.DataFrame({
         'datetime': dates_long,
-        'irradiance': np.zeros(720),
-        'temperature': np.random.uniform(25, 35, 720),
+        # Set daylight irradiance (built before the frame, no .loc pass afterwards)
+        'irradiance': np.where((hour >= 6) & (hour <= 18), 800.0, 0.0),
+        'temperature': get_mock_weather(periods=720)['temperature'].to_numpy(),
         'precipitation': np.zeros(720)
     })
-    # Set daylight irradiance
-    df_vis.loc[(df_vis.datetime.dt.hour >= 6) & (df_vis.datetime.dt.hour <= 18), 'irradiance'] = 800.0
     
     # Use just one farm to keep output clean, or same list
     # Ensure it needs cleaning by setting prior dust high? 
@@ -0,0 +1,183 @@
+import sys
+import os
+import io
+import pickle
+import tempfile
+import subprocess
+import contextlib
+import numpy as np
+import pandas as pd
+
+# Ensure local imports
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from numba_compat import NUMBA_AVAILABLE
+from optimization_engine import OptimizationEngine
+from multi_farm_optimizer import SolarFarm, MultiSiteOptimizer
+from degradation_model import calculate_energy_metrics, simulate_total_energy
+from scenario_analysis import get_recommended_cleaning_date
+from section_optimizer import generate_farm_grid, optimize_section_cleaning
+
+# Every hot path with a Numba kernel keeps a NumPy fallback (see numba_compat).
+# The same seeded cases run once per path, each in its own process (the switch is
+# read at import), and the results must agree.
+N_CASES = 20
+
+
+def _schedule_dp_cases(rng):
+    results = []
+    for _ in range(N_CASES):
+        days = int(rng.integers(20, 150))
+        energy = rng.uniform(0, 60, days)
+        recoverable = rng.uniform(0, 12, days)
+        rain = np.where(rng.random(days) < 0.1, rng.exponential(4.0, days), 0.0) if rng.random() < 0.7 else None
+        engine = OptimizationEngine(electricity_price=float(rng.uniform(4, 9)),
+                                    cleaning_cost=float(rng.uniform(50, 600)))
+        result = engine.optimize_cleaning_schedule_arrays(energy, recoverable, rain,
+                                                          min_days_between_clean=int(rng.integers(1, 10)))
+        results.append((result['cleaning_dates'], float(result['total_net_value'])))
+    return results
+
+
+def _knapsack_cases(rng):
+    results = []
+    for _ in range(N_CASES):
+        n = int(rng.integers(1, 30))
+        unit = int(rng.choice([1, 50, 250]))
+        farms = []
+        for i in range(n):
+            farm = SolarFarm(f"F{i}", (13, 80), 1000, cleaning_water_usage_liters=int(rng.integers(1, 20)) * unit)
+            farm.net_benefit = float(np.round(rng.uniform(-50, 500), 2))
+            farm.action = "CLEAN"
+            farms.append(farm)
+        opt = MultiSiteOptimizer(farms, water_budget_liters=int(rng.integers(0, 60)) * unit)
+        with contextlib.redirect_stdout(io.StringIO()):
+            selected, water_used, benefit = opt.optimize(shared_data_df=None)
+        results.append(([f.name for f in selected], water_used, benefit))
+    return results
+
+
+def _weather(rng, periods):
+    return pd.DataFrame({
+        'datetime': pd.date_range('2025-01-01', periods=periods, freq='h'),
+        'irradiance': np.clip(rng.normal(400, 350, periods), 0, None),
+        'temperature': rng.normal(30, 6, periods),
+        # Mostly dry, some storms, a few missing readings
+        'precipitation': np.where(rng.random(periods) < 0.03, rng.exponential(3.0, periods),
+                                  np.where(rng.random(periods) < 0.01, np.nan, 0.0)),
+    })
+
+
+def _dust_cases(rng):
+    results = []
+    for _ in range(N_CASES):
+        df = _weather(rng, 24 * int(rng.integers(5, 60)))
+        cleaning_dates = list(df['datetime'].sample(int(rng.integers(0, 4)), random_state=rng).dt.date)
+        processed = calculate_energy_metrics(df, cleaning_dates=cleaning_dates)
+        results.append((processed['dust_level'].to_numpy(), processed['actual_energy_kwh'].to_numpy()))
+    return results
+
+
+def _window_scan_cases(rng):
+    results = []
+    df = _weather(rng, 24)  # Only checked for emptiness when daily totals are passed
+    for _ in range(N_CASES):
+        days = int(rng.integers(3, 60))
+        daily = pd.Series(rng.uniform(0, 40, days) * rng.uniform(0.5, 30),
+                          index=pd.date_range('2025-01-01', periods=days, freq='D'))
+        date = get_recommended_cleaning_date(
+            df,
+            electricity_price_inr=float(rng.uniform(3, 9)),
+            cleaning_cost_inr=float(rng.uniform(100, 5000)),
+            projection_days=int(rng.integers(1, 10)),
+            carbon_weight=float(rng.uniform(0, 2)),
+            daily_recoverable=daily,
+        )
+        results.append(date)
+    return results
+
+
+def _section_greedy_cases(rng):
+    results = []
+    for _ in range(N_CASES):
+        grid = generate_farm_grid(float(rng.uniform(1, 50)), int(rng.integers(1, 12)), int(rng.integers(1, 12)),
+                                  seed=int(rng.integers(1 << 30)))
+        grid.cleaning_priority[:] = rng.random(len(grid))
+        budget = float(rng.uniform(0, grid.panel_area.sum() * 5))
+        selected, water_used = optimize_section_cleaning(grid, budget)
+        results.append(([s.id for s in selected], water_used))
+    return results
+
+
+def _monte_carlo_cases(rng):
+    results = []
+    for _ in range(5):
+        df = _weather(rng, 24 * 30)
+        irradiance = np.clip(df['irradiance'].to_numpy() * rng.normal(1, 0.2, (16, len(df))), 0, None)
+        temperature = df['temperature'].to_numpy() + rng.normal(0, 3, (16, len(df)))
+        results.append(simulate_total_energy(df, irradiance, temperature, cleaning_dates=[df['datetime'].iloc[200]]))
+    return results
+
+
+CHECKS = {
+    'Schedule DP': _schedule_dp_cases,
+    'Portfolio knapsack': _knapsack_cases,
+    'Dust levels': _dust_cases,
+    'Recommended-date window scan': _window_scan_cases,
+    'Section greedy tail': _section_greedy_cases,
+    'Monte Carlo energy totals': _monte_carlo_cases,
+}
+
+
+def collect_results():
+    rng = np.random.default_rng(0)
+    return {name: cases(rng) for name, cases in CHECKS.items()}
+
+
+def _matches(a, b):
+    # Floats may differ in the last bits (the kernels sum in a different order); everything else exactly
+    if isinstance(a, (list, tuple)):
+        return isinstance(b, (list, tuple)) and len(a) == len(b) and all(_matches(x, y) for x, y in zip(a, b))
+    if isinstance(a, (float, np.floating, np.ndarray)):
+        return np.shape(a) == np.shape(b) and np.allclose(a, b, rtol=1e-12, atol=1e-9, equal_nan=True)
+    return a == b
+
+
+def _run_path(disable_numba):
+    """Results for one path, computed in a fresh interpreter."""
+    env = dict(os.environ, SOLAROS_DISABLE_NUMBA="1" if disable_numba else "0")
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = os.path.join(tmp, "results.pkl")
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--collect", out_path],
+                       env=env, check=True, stdout=subprocess.DEVNULL)
+        with open(out_path, "rb") as f:
+            return pickle.load(f)
+
+
+def run_parity_check():
+    print("==========================================")
+    print("   NUMBA / NUMPY PARITY VERIFICATION      ")
+    print("==========================================")
+    if not NUMBA_AVAILABLE:
+        print("(!) Numba not available: both runs take the NumPy paths.")
+
+    compiled = _run_path(disable_numba=False)
+    fallback = _run_path(disable_numba=True)
+
+    failed = []
+    for name in CHECKS:
+        if _matches(compiled[name], fallback[name]):
+            print(f"[PASS]: {name} ({len(compiled[name])} cases)")
+        else:
+            print(f"[FAIL]: {name} - Numba and NumPy paths disagree")
+            failed.append(name)
+
+    assert not failed, f"Numba/NumPy mismatch in: {', '.join(failed)}"
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--collect":
+        with open(sys.argv[2], "wb") as f:
+            pickle.dump(collect_results(), f)
+    else:
+        run_parity_check()
@@ -13,7 +13,9 @@ def generate_ascii_plot(data, title="Efficiency Trend", height=10, width=50):
     if data is None or len(data) == 0:
         return "No data to plot."
         
-    y = np.array(data)
+    # No copy for float64 arrays (e.g. the daily efficiency trace); the min/max stay in
+    # float64 since they are printed as the axis labels
+    y = np.asarray(data, dtype=np.float64)
     y_min, y_max = y.min(), y.max()
     y_range = y_max - y_min
     
@@ -24,26 +26,28 @@ def generate_ascii_plot(data, title="Efficiency Trend", height=10, width=50):
     x_indices = np.linspace(0, len(y) - 1, width).astype(int)
     y_scaled = y[x_indices]
     
-    # Create canvas
-    canvas = [[' ' for _ in range(width)] for _ in range(height)]
+    # Canvas as a (height, width) byte array, blank = ' '
+    canvas = np.full((height, width), ord(' '), dtype=np.uint8)
+    
+    # Plot points: all row indices at once
+    # Normalized height 0 to 1
+    norm_h = (y_scaled - y_min) / y_range
+    # Scale to row index (height-1 is 0, 0 is max); astype truncates like int()
+    row_idx = ((1.0 - norm_h) * (height - 1)).astype(np.intp)
+    canvas[row_idx, np.arange(width)] = ord('*')
+    # One bytes object per row through a fixed-width bytes view of the canvas (no per-row slicing)
+    rows = canvas.view(f"S{width}").ravel().tolist()
     
-    # Plot points
-    for x_idx, value in enumerate(y_scaled):
-        # Normalized height 0 to 1
-        norm_h = (value - y_min) / y_range
-        # Scale to row index (height-1 is 0, 0 is max)
-        row_idx = int((1.0 - norm_h) * (height - 1))
-        canvas[row_idx][x_idx] = '*'
-        
     # Build string
     output = []
     output.append(f"--- {title} ---")
-    output.append(f"{y_max:.2f} | " + "".join(canvas[0]))
+    output.append(f"{y_max:.2f} | " + rows[0].decode('ascii'))
     
-    for row in canvas[1:-1]:
-        output.append("       | " + "".join(row))
+    if height > 2:
+        # Middle rows all share the same prefix: one join over the bytes rows
+        output.append("       | " + b"\n       | ".join(rows[1:-1]).decode('ascii'))
         
-    output.append(f"{y_min:.2f} | " + "".join(canvas[-1]))
+    output.append(f"{y_min:.2f} | " + rows[-1].decode('ascii'))
     output.append("       " + "-" * width)
     
     return "\n".join(output)
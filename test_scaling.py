@@ -1,35 +1,22 @@
 import sys
 sys.path.insert(0, 'ml')
 
-from scenario_analysis import compare_30day_scenarios
+from scenario_analysis import compare_30day_scenarios_batch
 
 print("="*60)
 print("TESTING MW-LEVEL SCALING")
 print("="*60)
 
-# Test 1: 5 MW plant
-print("\n[TEST 1] 5 MW Plant")
-result_5mw = compare_30day_scenarios(plant_capacity_mw=5, days=30)
-comp = result_5mw.get('comparison', {})
-print(f"Energy Recovered: {comp.get('additional_energy_gained_kwh', 0):,.2f} kWh")
-print(f"CO2 Saved: {comp.get('carbon_saved_kg', 0):,.2f} kg")
-print(f"Net Benefit: ₹{comp.get('net_economic_gain_inr', 0):,.2f}")
+# One weather fetch / dust simulation shared by all three plant sizes
+capacities_mw = [5, 25, 100]
+results = compare_30day_scenarios_batch(capacities_mw, days=30)
 
-# Test 2: 25 MW plant
-print("\n[TEST 2] 25 MW Plant")
-result_25mw = compare_30day_scenarios(plant_capacity_mw=25, days=30)
-comp = result_25mw.get('comparison', {})
-print(f"Energy Recovered: {comp.get('additional_energy_gained_kwh', 0):,.2f} kWh")
-print(f"CO2 Saved: {comp.get('carbon_saved_kg', 0):,.2f} kg")
-print(f"Net Benefit: ₹{comp.get('net_economic_gain_inr', 0):,.2f}")
-
-# Test 3: 100 MW plant
-print("\n[TEST 3] 100 MW Plant")
-result_100mw = compare_30day_scenarios(plant_capacity_mw=100, days=30)
-comp = result_100mw.get('comparison', {})
-print(f"Energy Recovered: {comp.get('additional_energy_gained_kwh', 0):,.2f} kWh")
-print(f"CO2 Saved: {comp.get('carbon_saved_kg', 0):,.2f} kg")
-print(f"Net Benefit: ₹{comp.get('net_economic_gain_inr', 0):,.2f}")
+for test_no, (capacity_mw, result) in enumerate(zip(capacities_mw, results), start=1):
+    print(f"\n[TEST {test_no}] {capacity_mw} MW Plant")
+    comp = result.get('comparison') or {}
+    print(f"Energy Recovered: {comp.get('additional_energy_gained_kwh', 0):,.2f} kWh")
+    print(f"CO2 Saved: {comp.get('carbon_saved_kg', 0):,.2f} kg")
+    print(f"Net Benefit: ₹{comp.get('net_economic_gain_inr', 0):,.2f}")
 
 print("\n" + "="*60)
 print("✅ All metrics are viable and scale properly!")
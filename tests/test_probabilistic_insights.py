@@ -30,7 +30,13 @@ payload = {
 
 try:
     print("Testing /optimize-farms with Probabilistic AI V3...")
-    response = requests.post(url, json=payload)
+    # One session (keep-alive connection, JSON header set once) and a body encoded once,
+    # so more farm / mode payloads can be POSTed without new handshakes or re-serializing
+    with requests.Session() as session:
+        session.headers["Content-Type"] = "application/json"
+        body = json.dumps(payload).encode()
+        # Connect quickly or fail; the optimization itself may take a while
+        response = session.post(url, data=body, timeout=(10, 300))
     
     if response.status_code == 200:
         data = response.json()
@@ -0,0 +1,51 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'ml'))
+
+import scenario_analysis
+from scenario_analysis import compare_30day_scenarios, compare_30day_scenarios_batch
+
+CAPACITIES_MW = [5, 25, 100]
+
+
+def _diurnal_weather(latitude=13.0827, longitude=80.2707, days=30):
+    # Offline stand-in for the NASA POWER fetch: clear-sky-ish days, one rainy afternoon
+    dates = pd.date_range('2025-01-01', periods=24 * days, freq='h')
+    hour = dates.hour.to_numpy()
+    rng = np.random.default_rng(7)
+    irradiance = np.clip(np.sin((hour - 6) / 12 * np.pi), 0, None) * 950 * rng.uniform(0.7, 1.0, len(dates))
+    precipitation = np.zeros(len(dates))
+    precipitation[24 * 20 + 15] = 4.0
+    return pd.DataFrame({
+        'datetime': dates,
+        'irradiance': irradiance,
+        'temperature': 27 + 6 * np.clip(np.sin((hour - 8) / 12 * np.pi), 0, None),
+        'precipitation': precipitation,
+    })
+
+
+@pytest.fixture(autouse=True)
+def offline_weather(monkeypatch):
+    monkeypatch.setattr(scenario_analysis, 'fetch_nasa_power_data', _diurnal_weather)
+
+
+def test_batch_matches_single_capacity_calls():
+    batch = compare_30day_scenarios_batch(CAPACITIES_MW, days=30)
+
+    assert len(batch) == len(CAPACITIES_MW)
+    for capacity_mw, result in zip(CAPACITIES_MW, batch):
+        single = compare_30day_scenarios(days=30, plant_capacity_mw=capacity_mw)
+        for scenario in ('scenario_no_cleaning', 'scenario_with_cleaning'):
+            assert result[scenario]['total_energy_kwh'] == pytest.approx(single[scenario]['total_energy_kwh'])
+            assert result[scenario]['total_recoverable_kwh'] == pytest.approx(single[scenario]['total_recoverable_kwh'])
+        assert result['comparison'] == pytest.approx(single['comparison'])
+
+
+def test_batch_rejects_mismatched_panel_areas():
+    with pytest.raises(ValueError):
+        compare_30day_scenarios_batch(CAPACITIES_MW, panel_areas=[25000.0, 125000.0])